@@ -8,7 +8,12 @@ from backend.routes.club import club_bp
 from backend.routes.find_team import find_team_bp
 from backend.routes.student import student_bp
 from backend.routes.collaboration import collaboration_bp
+from backend.routes.search import search_bp
 from backend.db import db
+from backend.utils.current_user import get_current_user
+from backend.utils.email_outbox import start_email_worker
+from backend.utils.maintenance import start_maintenance_worker
+from backend.migrations import check_schema_version
 import os
 from dotenv import load_dotenv
 from backend.config import SMTP_CONFIG, APP_CONFIG
@@ -38,6 +43,20 @@ app.register_blueprint(find_team_bp)
 app.register_blueprint(club_bp)
 app.register_blueprint(student_bp)
 app.register_blueprint(collaboration_bp)
+app.register_blueprint(search_bp)
+
+# Return each request's pooled DB connection on teardown
+db.init_app(app)
+
+# Schema changes are applied by `python -m backend.migrations`; workers only
+# read the applied version and warn if the database is behind
+check_schema_version(app, db)
+
+# Deliver queued mail (OTPs) off the request path
+start_email_worker(app)
+
+# Periodic cleanup (ended team chats) in bounded batches
+start_maintenance_worker(app)
 
 # ===============================
 # CONTEXT PROCESSOR
@@ -47,10 +66,7 @@ def inject_user():
     user = None
     if 'user_id' in session:
         try:
-            cursor = db.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-            user = cursor.fetchone()
-            cursor.close()
+            user = get_current_user()
         except Exception as e:
             app.logger.error(f"Error injecting user: {e}")
     return dict(user=user, now=datetime.now())
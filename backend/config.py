@@ -11,6 +11,13 @@ DB_CONFIG = {
     "port": int(os.getenv("DB_PORT", 3306))
 }
 
+DB_POOL_CONFIG = {
+    "min_size": int(os.getenv("DB_POOL_MIN", 1)),
+    "max_size": int(os.getenv("DB_POOL_MAX", 10)),
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    "ping_interval": float(os.getenv("DB_POOL_PING_INTERVAL", "30"))
+}
+
 SMTP_CONFIG = {
     "SMTP_HOST": os.getenv("SMTP_HOST"),
     "SMTP_PORT": int(os.getenv("SMTP_PORT", 587)),
@@ -21,7 +28,38 @@ SMTP_CONFIG = {
     "SMTP_STRICT": str(os.getenv("SMTP_STRICT", "false")).lower() in ("1", "true", "yes", "on")
 }
 
+EMAIL_OUTBOX_CONFIG = {
+    "ENABLED": str(os.getenv("EMAIL_WORKER_ENABLED", "true")).lower() in ("1", "true", "yes", "on"),
+    "BATCH_SIZE": int(os.getenv("EMAIL_BATCH_SIZE", 20)),
+    "POLL_INTERVAL": float(os.getenv("EMAIL_POLL_INTERVAL", "5")),
+    "MAX_ATTEMPTS": int(os.getenv("EMAIL_MAX_ATTEMPTS", 6)),
+    "BACKOFF_BASE": float(os.getenv("EMAIL_BACKOFF_BASE", "15")),
+    "BACKOFF_MAX": float(os.getenv("EMAIL_BACKOFF_MAX", "1800")),
+    "SMTP_IDLE_TIMEOUT": float(os.getenv("SMTP_IDLE_TIMEOUT", "60")),
+    "FAILED_RETENTION_DAYS": int(os.getenv("EMAIL_FAILED_RETENTION_DAYS", 7))
+}
+
+MAINTENANCE_CONFIG = {
+    "ENABLED": str(os.getenv("MAINTENANCE_ENABLED", "true")).lower() in ("1", "true", "yes", "on"),
+    "INTERVAL": float(os.getenv("MAINTENANCE_INTERVAL", "900")),
+    "BATCH_SIZE": int(os.getenv("MAINTENANCE_BATCH_SIZE", 1000)),
+    "BATCH_PAUSE": float(os.getenv("MAINTENANCE_BATCH_PAUSE", "0.05"))
+}
+
 APP_CONFIG = {
     "SECRET_KEY": os.getenv("SECRET_KEY", "dev_secret_key_change_in_production"),
-    "ALLOWED_DOMAINS": os.getenv("ALLOWED_DOMAINS", "anurag.edu.in")
+    "ALLOWED_DOMAINS": os.getenv("ALLOWED_DOMAINS", "anurag.edu.in"),
+    "USER_CACHE_TTL": float(os.getenv("USER_CACHE_TTL", "30")),
+    "USER_CACHE_SIZE": int(os.getenv("USER_CACHE_SIZE", 2048)),
+    "SCHEMA_CACHE_TTL": float(os.getenv("SCHEMA_CACHE_TTL", "300")),
+    "CHAT_STREAM_KEEPALIVE": float(os.getenv("CHAT_STREAM_KEEPALIVE", "20")),
+    "CHAT_STREAM_MAX_AGE": float(os.getenv("CHAT_STREAM_MAX_AGE", "300")),
+    "CLUB_STATS_TTL": float(os.getenv("CLUB_STATS_TTL", "300")),
+    "CHAT_AUTH_TTL": float(os.getenv("CHAT_AUTH_TTL", "30")),
+    # Per-email token buckets: BURST requests at once, then one every INTERVAL seconds
+    "OTP_SEND_BURST": int(os.getenv("OTP_SEND_BURST", 3)),
+    "OTP_SEND_INTERVAL": float(os.getenv("OTP_SEND_INTERVAL", "60")),
+    "OTP_VERIFY_BURST": int(os.getenv("OTP_VERIFY_BURST", 5)),
+    "OTP_VERIFY_INTERVAL": float(os.getenv("OTP_VERIFY_INTERVAL", "30")),
+    "RATE_LIMIT_SIZE": int(os.getenv("RATE_LIMIT_SIZE", 10000))
 }
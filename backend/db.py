@@ -1,5 +1,9 @@
+import threading
+import time
+from collections import deque
 import mysql.connector
-from backend.config import DB_CONFIG
+from flask import g, has_app_context
+from backend.config import DB_CONFIG, DB_POOL_CONFIG
 
 def _connect_db(host_override=None):
     host_env = DB_CONFIG.get("host", "localhost")
@@ -26,51 +30,240 @@ def _connect_db(host_override=None):
             last_err = err
     raise last_err or RuntimeError("Unknown MySQL connection error")
 
-class ReconnectingDB:
-    def __init__(self):
-        self._conn = None
+class PoolTimeout(RuntimeError):
+    pass
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections shared by all worker threads.
+
+    Connections are opened lazily up to ``max_size``; once that many are
+    checked out, callers wait up to ``timeout`` seconds for one to be released.
+    Idle connections are pinged on checkout if they have not been used for
+    ``ping_interval`` seconds, and replaced when the ping fails.
+    """
+
+    def __init__(self, min_size=1, max_size=10, timeout=10.0, ping_interval=30.0, connect=_connect_db):
+        self.min_size = max(0, int(min_size))
+        self.max_size = max(1, int(max_size), self.min_size)
+        self.timeout = float(timeout)
+        self.ping_interval = float(ping_interval)
+        self._connect = connect
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._filled = False
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "discarded": 0,
+        }
+
+    def _fill(self):
+        # Called with the condition held; pre-opens min_size connections once
+        self._filled = True
+        while self._size < self.min_size:
+            try:
+                self._idle.append((self._connect(), time.monotonic()))
+                self._size += 1
+            except Exception as e:
+                print(f"Error pre-opening MySQL connection: {e}")
+                break
+
+    def _healthy(self, conn, last_used):
+        if self.ping_interval > 0 and time.monotonic() - last_used < self.ping_interval:
+            return True
+        try:
+            conn.ping(reconnect=True, attempts=1, delay=0)
+            return True
+        except Exception:
+            self._metrics["health_check_failures"] += 1
+            return False
+
+    def acquire(self):
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            if not self._filled:
+                self._fill()
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._metrics["timeouts"] += 1
+                    raise PoolTimeout(f"Timed out after {self.timeout}s waiting for a MySQL connection (pool size {self.max_size})")
+                waited = True
+                self._cond.wait(remaining)
+            self._metrics["checkouts"] += 1
+            if waited:
+                elapsed = time.monotonic() - started
+                self._metrics["waits"] += 1
+                self._metrics["wait_seconds_total"] += elapsed
+                self._metrics["wait_seconds_max"] = max(self._metrics["wait_seconds_max"], elapsed)
+
+        # Network I/O happens outside the lock
+        if conn is not None and self._healthy(conn, last_used):
+            return conn
+        if conn is not None:
+            self._close_quietly(conn)
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard=False):
+        if conn is None:
+            return
+        if not discard:
+            try:
+                # Never hand an open transaction to the next request
+                conn.rollback()
+            except Exception:
+                discard = True
+        if discard:
+            self._close_quietly(conn)
+        with self._cond:
+            if discard:
+                self._size -= 1
+                self._metrics["discarded"] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._filled = False
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        with self._cond:
+            out = dict(self._metrics)
+            out.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            })
+        return out
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+class PooledDB:
+    """Drop-in replacement for the old single shared connection.
+
+    Inside a Flask app context the connection is checked out on first use and
+    stored on ``g``, so every request gets its own connection and returns it on
+    teardown. Outside an app context (scripts, import-time code) it is held per
+    thread until ``release()`` is called.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._local = threading.local()
+
+    def init_app(self, app):
+        app.teardown_appcontext(self._teardown)
+        # Hand back anything the importing thread checked out while loading blueprints
+        self.release()
+
+    def _teardown(self, exc=None):
+        self.release()
+
+    def _get_slot(self):
+        if has_app_context():
+            return g.get("_db_conn")
+        return getattr(self._local, "conn", None)
+
+    def _set_slot(self, conn):
+        if has_app_context():
+            if conn is None:
+                g.pop("_db_conn", None)
+            else:
+                g._db_conn = conn
+        else:
+            self._local.conn = conn
 
     def _ensure(self):
+        conn = self._get_slot()
+        if conn is not None:
+            return conn
         try:
-            if self._conn is None:
-                self._conn = _connect_db()
-            elif not self._conn.is_connected():
-                try:
-                    self._conn.reconnect(attempts=3, delay=2)
-                except Exception:
-                    self._conn = _connect_db()
+            conn = self.pool.acquire()
         except Exception as e:
             print(f"Error connecting to MySQL: {e}")
             print("Ensure that your MySQL server is running and reachable at the configured host and port.")
             raise
+        self._set_slot(conn)
+        return conn
+
+    def connection(self):
+        return self._ensure()
 
     def cursor(self, *args, **kwargs):
-        self._ensure()
-        return self._conn.cursor(*args, **kwargs)
+        return self._ensure().cursor(*args, **kwargs)
 
     def commit(self):
-        self._ensure()
-        return self._conn.commit()
+        return self._ensure().commit()
 
     def rollback(self):
         try:
-            if self._conn:
-                return self._conn.rollback()
+            conn = self._get_slot()
+            if conn:
+                return conn.rollback()
         except Exception:
             return None
 
-    def close(self):
+    def release(self):
+        conn = self._get_slot()
+        if conn is None:
+            return
+        self._set_slot(None)
         try:
-            if self._conn:
-                self._conn.close()
+            broken = not conn.is_connected()
         except Exception:
-            pass
+            broken = True
+        self.pool.release(conn, discard=broken)
+
+    def close(self):
+        self.release()
+        self.pool.close_all()
 
     def is_connected(self):
         try:
-            return self._conn.is_connected() if self._conn else False
+            conn = self._get_slot()
+            return conn.is_connected() if conn else False
         except Exception:
             return False
 
-# Export a reconnecting DB handle compatible with existing usage
-db = ReconnectingDB()
+    def stats(self):
+        return self.pool.stats()
+
+# Export a pooled DB handle compatible with existing usage
+db = PooledDB(ConnectionPool(
+    min_size=DB_POOL_CONFIG.get("min_size", 1),
+    max_size=DB_POOL_CONFIG.get("max_size", 10),
+    timeout=DB_POOL_CONFIG.get("timeout", 10.0),
+    ping_interval=DB_POOL_CONFIG.get("ping_interval", 30.0),
+))
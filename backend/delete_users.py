@@ -23,6 +23,24 @@ def delete_users():
             return
 
         format_strings = ','.join(['%s'] * len(ids_to_delete))
+
+        # Their accepted collaboration requests go with them (ON DELETE
+        # CASCADE), so give the seats back in the same transaction
+        cursor.execute(f"""
+            UPDATE faculty_collaborations fc
+            JOIN (
+                SELECT cr.collaboration_id,
+                       SUM(u.role = 'student') AS students,
+                       SUM(u.role = 'faculty') AS faculty
+                FROM collaboration_requests cr
+                JOIN users u ON cr.user_id = u.id
+                WHERE cr.status = 'accepted' AND cr.user_id IN ({format_strings})
+                GROUP BY cr.collaboration_id
+            ) d ON d.collaboration_id = fc.id
+            SET fc.accepted_students = GREATEST(fc.accepted_students - d.students, 0),
+                fc.accepted_faculty = GREATEST(fc.accepted_faculty - d.faculty, 0)
+        """, tuple(ids_to_delete))
+
         query = f"DELETE FROM users WHERE id IN ({format_strings})"
         
         cursor.execute(query, tuple(ids_to_delete))
@@ -33,6 +51,10 @@ def delete_users():
         cursor.close()
         conn.close()
     except Exception as e:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
         print(f"Error: {e}")
 
 if __name__ == "__main__":
@@ -1,3 +1,5 @@
+# Historical one-off migration; the schema is now maintained in backend/migrations
+# (python -m backend.migrations).
 import mysql.connector
 import sys
 import os
@@ -0,0 +1,151 @@
+import importlib
+import pkgutil
+import re
+import mysql.connector
+
+# Versioned schema migrations. Each module named mNNNN_<name>.py defines
+# ``upgrade(cursor)`` and must be idempotent (MySQL DDL commits implicitly, so
+# a migration interrupted half-way is simply re-run). Applied versions are
+# recorded in schema_migrations; run them with
+#
+#     python -m backend.migrations            # apply pending migrations
+#     python -m backend.migrations status     # show applied / pending
+#
+# Web workers never run DDL; at startup they only read the current version.
+_MODULE_RE = re.compile(r"^m(\d{4})_(\w+)$")
+LOCK_NAME = "anveshan_schema_migrations"
+LOCK_TIMEOUT = 60
+
+SCHEMA_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+def add_column(cursor, table, column, definition):
+    """ALTER TABLE ... ADD COLUMN, ignoring 'duplicate column' (1060)."""
+    try:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    except mysql.connector.Error as err:
+        if err.errno != 1060:
+            raise
+
+def add_index(cursor, table, name, columns, kind=""):
+    """CREATE [kind] INDEX, ignoring 'duplicate key name' (1061)."""
+    try:
+        cursor.execute(f"CREATE {kind + ' ' if kind else ''}INDEX {name} ON {table} ({columns})")
+    except mysql.connector.Error as err:
+        if err.errno != 1061:
+            raise
+
+def add_foreign_key(cursor, table, name, column, reference, on_delete="RESTRICT"):
+    """ALTER TABLE ... ADD CONSTRAINT FOREIGN KEY unless ``name`` already exists."""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.TABLE_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = %s
+          AND CONSTRAINT_NAME = %s AND CONSTRAINT_TYPE = 'FOREIGN KEY'
+    """, (table, name))
+    if cursor.fetchall():
+        return
+    cursor.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+        f"REFERENCES {reference} ON DELETE {on_delete}"
+    )
+
+def discover():
+    """[(version, name, module path)] for every migration module, in order."""
+    found = []
+    for info in pkgutil.iter_modules(__path__):
+        m = _MODULE_RE.match(info.name)
+        if m:
+            found.append((int(m.group(1)), m.group(2), f"{__name__}.{info.name}"))
+    found.sort()
+    versions = [v for v, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return found
+
+def latest_version():
+    found = discover()
+    return found[-1][0] if found else 0
+
+def applied_versions(cursor):
+    cursor.execute(SCHEMA_MIGRATIONS_DDL)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+def migrate(conn, target=None):
+    """Apply pending migrations up to ``target`` (default: all) on ``conn``.
+
+    Holds a MySQL named lock so concurrent runners (e.g. several release
+    tasks) apply each migration once. Returns the versions applied.
+    """
+    cursor = conn.cursor()
+    applied_now = []
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT))
+        if cursor.fetchone()[0] != 1:
+            raise RuntimeError("Another migration run holds the schema lock")
+        try:
+            done = applied_versions(cursor)
+            for version, name, path in discover():
+                if version in done or (target is not None and version > target):
+                    continue
+                print(f"Applying migration {version:04d}_{name}...")
+                importlib.import_module(path).upgrade(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                conn.commit()
+                applied_now.append(version)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
+    return applied_now
+
+def status(conn):
+    """[(version, name, applied)] for every known migration."""
+    cursor = conn.cursor()
+    try:
+        done = applied_versions(cursor)
+        conn.commit()
+    finally:
+        cursor.close()
+    return [(version, name, version in done) for version, name, _ in discover()]
+
+def current_version(cursor):
+    """Highest applied version; 0 when migrations have never run. Read-only."""
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_migrations")
+    except Exception:
+        return 0
+    row = cursor.fetchone()
+    return (row[0] if row else None) or 0
+
+def check_schema_version(app, db):
+    """Startup check: log (never raise) when the database is behind the code."""
+    expected = latest_version()
+    try:
+        cursor = db.cursor()
+        try:
+            version = current_version(cursor)
+        finally:
+            cursor.close()
+            db.release()
+    except Exception as e:
+        app.logger.warning("Schema version check skipped, database unavailable: %s", e)
+        return None
+    if version < expected:
+        app.logger.warning(
+            "Database schema is at version %s but the code expects %s; run `python -m backend.migrations`",
+            version, expected
+        )
+    return version
@@ -0,0 +1,27 @@
+import sys
+from backend.db import db
+from backend.migrations import migrate, status
+from backend.utils.schema import schema
+
+USAGE = "usage: python -m backend.migrations [upgrade [VERSION] | status]"
+
+def main(argv):
+    command = argv[0] if argv else "upgrade"
+    try:
+        if command == "upgrade":
+            target = int(argv[1]) if len(argv) > 1 else None
+            applied = migrate(db, target)
+            schema.refresh()
+            print(f"Applied {len(applied)} migration(s)." if applied else "Schema is up to date.")
+        elif command == "status":
+            for version, name, applied in status(db):
+                print(f"{version:04d}  {'applied' if applied else 'pending'}  {name}")
+        else:
+            print(USAGE)
+            return 2
+    finally:
+        db.release()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,558 @@
+"""Baseline schema: every table, column and index the app relied on before
+versioned migrations, including the tables routes used to create at import
+time. Each step is idempotent (IF NOT EXISTS, duplicate column/index errors
+ignored), so it is safe on both empty and long-lived databases; any other
+error aborts the run so version 1 is never recorded for a half-built schema.
+
+Everything the data steps depend on is copied in below rather than imported
+from the app, so later changes to the app cannot change what version 1 does.
+"""
+import re
+from backend.migrations import add_column, add_index
+
+_YEAR_MAP = {
+    "1": "1st", "i": "1st", "first": "1st", "1st": "1st",
+    "2": "2nd", "ii": "2nd", "second": "2nd", "2nd": "2nd",
+    "3": "3rd", "iii": "3rd", "third": "3rd", "3rd": "3rd",
+    "4": "4th", "iv": "4th", "fourth": "4th", "4th": "4th"
+}
+
+def _normalize_target_years(value):
+    if not value:
+        return None
+    years = []
+    for part in str(value).split(","):
+        y = part.strip().lower().replace("year", "").strip()
+        y = _YEAR_MAP.get(y, y)
+        if y and y not in years:
+            years.append(y)
+    return ",".join(years) or None
+
+FULLTEXT_INDEXES = [
+    ("events", "ft_events_search", "title, organizer, description, domains"),
+    ("personal_projects", "ft_personal_projects_search", "title, domain, description, tech_stack, looking_for"),
+    ("faculty_collaborations", "ft_faculty_collaborations_search", "title, description, required_skills"),
+    ("users", "ft_users_search", "name, bio, skills, interests"),
+]
+
+# Skill tokenizer as of this version (see utils/skill_index.py)
+SKILL_MAX_LEN = 100
+_SKILL_SPLIT_RE = re.compile(r'[/&]|\band\b')
+_SKILL_GROUPS = [
+    ('ai', 'artificial intelligence'),
+    ('ml', 'machine learning'),
+    ('ds', 'data science'),
+    ('web dev', 'web development'),
+    ('app dev', 'app development', 'mobile app development'),
+    ('js', 'javascript'),
+    ('ts', 'typescript'),
+    ('cpp', 'c++'),
+    ('react', 'reactjs', 'react.js'),
+    ('node', 'nodejs', 'node.js'),
+    ('ui/ux', 'user interface', 'user experience', 'ui', 'ux'),
+    ('py', 'python'),
+]
+_SKILL_GROUP_OF = {term: group for group in _SKILL_GROUPS for term in group}
+
+def _skill_tokens(*values):
+    terms = []
+    for value in values:
+        if not value:
+            continue
+        for part in str(value).split(','):
+            t = part.strip().lower()
+            if not t:
+                continue
+            terms.append(t)
+            terms.extend(p.strip() for p in _SKILL_SPLIT_RE.split(t) if p.strip())
+    tokens = set()
+    for t in terms:
+        tokens.add(t)
+        tokens.update(_SKILL_GROUP_OF.get(t, ()))
+    return {t[:SKILL_MAX_LEN] for t in tokens if t}
+
+def upgrade(cursor):
+
+    # 1. USERS Table
+    # Combined schema from anveshan.sql, migrate_users.py, and migrate_collaboration.py
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(50),
+            email VARCHAR(255) UNIQUE,
+            password VARCHAR(255),
+            role VARCHAR(20),
+            profile_photo VARCHAR(255) DEFAULT 'default.jpg',
+            bio TEXT,
+            skills TEXT,
+            linkedin_url VARCHAR(255),
+            github_url VARCHAR(255),
+            branch VARCHAR(50),
+            year VARCHAR(20),
+            section VARCHAR(10),
+            interests TEXT,
+            portfolio_url VARCHAR(255),
+            medium_url VARCHAR(255),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    print("- users table checked.")
+
+    # 2. EVENTS Table (from anveshan.sql)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(100),
+            event_date DATE,
+            deadline DATE,
+            organizer VARCHAR(50),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    print("- events table checked.")
+
+    # Ensure events table has required columns for features
+    event_columns_to_ensure = [
+        ("event_type", "VARCHAR(50)"),
+        ("description", "TEXT"),
+        ("mode", "VARCHAR(50)"),
+        ("venue", "VARCHAR(255)"),
+        ("organizer", "VARCHAR(100)"),
+        ("domains", "TEXT"),
+        ("organising_department", "VARCHAR(100)"),
+        ("created_by", "INT"),
+        ("min_team_size", "INT DEFAULT 1"),
+        ("max_team_size", "INT DEFAULT 4"),
+        ("registration_fee", "DECIMAL(10,2) DEFAULT 0"),
+        ("girls_discount_enabled", "TINYINT(1) DEFAULT 0"),
+        ("girls_team_discount", "DECIMAL(10,2) DEFAULT 0"),
+        ("start_time", "DATETIME NULL"),
+        ("end_time", "DATETIME NULL"),
+        ("poster_path", "VARCHAR(255)"),
+        ("external_registration_link", "VARCHAR(500)"),
+        ("target_years", "VARCHAR(100)"),
+        ("target_years_norm", "VARCHAR(32)")
+    ]
+    for col_name, col_type in event_columns_to_ensure:
+        add_column(cursor, "events", col_name, col_type)
+
+    # Normalized copy of target_years ('1st Year,II' -> '1st,2nd') for FIND_IN_SET filtering
+    cursor.execute("SELECT id, target_years FROM events WHERE target_years IS NOT NULL AND target_years_norm IS NULL")
+    for event_id, target_years in cursor.fetchall():
+        cursor.execute("UPDATE events SET target_years_norm = %s WHERE id = %s", (_normalize_target_years(target_years), event_id))
+
+    # Indexes backing the student dashboard filters
+    event_indexes = [
+        ("idx_events_deadline", "deadline"),
+        ("idx_events_end_time", "end_time"),
+        ("idx_events_event_date", "event_date"),
+        ("idx_events_created_at", "created_at"),
+        ("idx_events_type_mode", "event_type, mode"),
+        ("idx_events_created_by", "created_by"),
+    ]
+    for idx_name, idx_cols in event_indexes:
+        add_index(cursor, "events", idx_name, idx_cols)
+    print("- events indexes checked.")
+
+    # 3. OTP_CODES Table (from auth.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS otp_codes (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            email VARCHAR(255) NOT NULL,
+            code_hash VARCHAR(255) NOT NULL,
+            purpose ENUM('password_reset','registration') NOT NULL,
+            expires_at DATETIME NOT NULL,
+            used TINYINT(1) DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    print("- otp_codes table checked.")
+
+    # Outgoing mail queue drained by the email worker (see utils/email_outbox.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            to_email VARCHAR(255) NOT NULL,
+            subject VARCHAR(255) NOT NULL,
+            body TEXT NOT NULL,
+            status ENUM('pending','sending','failed') NOT NULL DEFAULT 'pending',
+            attempts INT NOT NULL DEFAULT 0,
+            last_error VARCHAR(500),
+            next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            claimed_by VARCHAR(64),
+            claimed_at DATETIME NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            KEY idx_email_outbox_due (status, next_attempt_at),
+            KEY idx_email_outbox_claim (claimed_by)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    print("- email_outbox table checked.")
+
+    # 4. PERSONAL_PROJECTS Table (from migrate_collaboration.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS personal_projects (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            domain VARCHAR(100),
+            description TEXT,
+            tech_stack VARCHAR(255),
+            looking_for VARCHAR(255),
+            apply_deadline DATETIME NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    print("- personal_projects table checked.")
+    # Keyset pagination of the community feeds (see collaboration.community)
+    for table, idx_name, idx_cols in [
+        ("personal_projects", "idx_personal_projects_created", "created_at, id"),
+        ("users", "idx_users_name", "name, id"),
+    ]:
+        add_index(cursor, table, idx_name, idx_cols)
+
+    # 5. PROJECT_REQUESTS, FOLLOWS, PROJECT_COMMENTS (from migrate_collab.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS project_requests (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            project_id INT NOT NULL,
+            user_id INT NOT NULL,
+            message TEXT,
+            status ENUM('pending', 'accepted', 'rejected') DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (project_id) REFERENCES personal_projects(id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    print("- project_requests table checked.")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS follows (
+            follower_id INT NOT NULL,
+            followed_id INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (follower_id, followed_id),
+            FOREIGN KEY (follower_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (followed_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    print("- follows table checked.")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS project_comments (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            project_id INT NOT NULL,
+            user_id INT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (project_id) REFERENCES personal_projects(id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    print("- project_comments table checked.")
+
+    # 6. FACULTY_COLLABORATIONS, COLLABORATION_REQUESTS (from migrate_faculty.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS faculty_collaborations (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            faculty_id INT NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            description TEXT,
+            collaboration_type ENUM('article', 'project') NOT NULL,
+            audience ENUM('faculty_only', 'students_only', 'both') NOT NULL,
+            max_students INT DEFAULT 0,
+            max_faculty INT DEFAULT 0,
+            required_skills TEXT,
+            required_skills_must TEXT,
+            required_skills_nice TEXT,
+            strict_visibility TINYINT(1) DEFAULT 0,
+            apply_deadline DATETIME NULL,
+            status ENUM('open', 'closed') DEFAULT 'open',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (faculty_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    print("- faculty_collaborations table checked.")
+
+    # Ensure new columns exist for backward DBs
+    add_column(cursor, "faculty_collaborations", "required_skills_must", "TEXT")
+    add_column(cursor, "faculty_collaborations", "required_skills_nice", "TEXT")
+    add_column(cursor, "faculty_collaborations", "strict_visibility", "TINYINT(1) DEFAULT 0")
+    add_column(cursor, "faculty_collaborations", "apply_deadline", "DATETIME NULL")
+    add_column(cursor, "personal_projects", "apply_deadline", "DATETIME NULL")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS collaboration_requests (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            collaboration_id INT NOT NULL,
+            user_id INT NOT NULL,
+            message TEXT,
+            status ENUM('pending', 'accepted', 'rejected') DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (collaboration_id) REFERENCES faculty_collaborations(id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+    print("- collaboration_requests table checked.")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS collaboration_comments (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            collaboration_id INT NOT NULL,
+            user_id INT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    print("- collaboration_comments table checked.")
+
+    # Denormalized accepted counts used for seat reservation (see
+    # utils/capacity.py), backfilled from the accepted requests; afterwards the
+    # reconcile_collaboration_seats maintenance job keeps them in line
+    for col_name in ("accepted_students", "accepted_faculty"):
+        add_column(cursor, "faculty_collaborations", col_name, "INT NOT NULL DEFAULT 0")
+    cursor.execute("""
+        UPDATE faculty_collaborations fc
+        LEFT JOIN (
+            SELECT cr.collaboration_id,
+                   SUM(u.role = 'student') AS students,
+                   SUM(u.role = 'faculty') AS faculty
+            FROM collaboration_requests cr
+            JOIN users u ON cr.user_id = u.id
+            WHERE cr.status = 'accepted'
+            GROUP BY cr.collaboration_id
+        ) c ON c.collaboration_id = fc.id
+        SET fc.accepted_students = COALESCE(c.students, 0),
+            fc.accepted_faculty = COALESCE(c.faculty, 0)
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_registrations (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            event_id INT NOT NULL,
+            team_name VARCHAR(255),
+            domain VARCHAR(100),
+            project_title VARCHAR(255),
+            team_lead_name VARCHAR(255),
+            team_lead_email VARCHAR(255),
+            team_lead_phone VARCHAR(20),
+            team_lead_year VARCHAR(20),
+            team_lead_branch VARCHAR(50),
+            team_lead_section VARCHAR(10),
+            payment_screenshot VARCHAR(255),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+        )
+    """)
+    print("- event_registrations table checked.")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_team_members (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            registration_id INT NOT NULL,
+            member_name VARCHAR(255),
+            member_email VARCHAR(255),
+            year VARCHAR(20),
+            branch VARCHAR(50),
+            section VARCHAR(10),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (registration_id) REFERENCES event_registrations(id) ON DELETE CASCADE
+        )
+    """)
+    print("- event_team_members table checked.")
+    # Club registrations page: newest-first per event, members per registration
+    for table, idx_name, idx_cols in [
+        ("event_registrations", "idx_event_registrations_event_created", "event_id, created_at"),
+        ("event_team_members", "idx_event_team_members_registration", "registration_id, id"),
+    ]:
+        add_index(cursor, table, idx_name, idx_cols)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_questions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            event_id INT NOT NULL,
+            student_email VARCHAR(255),
+            question TEXT NOT NULL,
+            answer TEXT,
+            answered_by INT,
+            status ENUM('open','answered') DEFAULT 'open',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            answered_at DATETIME NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    print("- event_questions table checked.")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS clubs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    print("- clubs table checked.")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS club_announcements (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            club_id INT NOT NULL,
+            registration_link VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (club_id) REFERENCES clubs(id) ON DELETE CASCADE
+        )
+    """)
+    print("- club_announcements table checked.")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS team_requests (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            email VARCHAR(255) NOT NULL,
+            event_id INT NOT NULL,
+            domain VARCHAR(100),
+            branch VARCHAR(50),
+            year VARCHAR(20),
+            required_size INT DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+        )
+    """)
+    print("- team_requests table checked.")
+
+    # Ensure team_requests has required_skills column
+    add_column(cursor, "team_requests", "required_skills", "TEXT")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS join_requests (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            team_request_id INT NOT NULL,
+            name VARCHAR(255) NOT NULL,
+            email VARCHAR(255) NOT NULL,
+            branch VARCHAR(50),
+            year VARCHAR(20),
+            phone VARCHAR(20),
+            status ENUM('pending','accepted','rejected') DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (team_request_id) REFERENCES team_requests(id) ON DELETE CASCADE
+        )
+    """)
+    print("- join_requests table checked.")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS team_chat_messages (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            team_request_id INT NOT NULL,
+            user_id INT NOT NULL,
+            message TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            KEY idx_team_chat_room_id (team_request_id, id),
+            FOREIGN KEY (team_request_id) REFERENCES team_requests(id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    # Keyset pagination over a room's messages (after_id / before_id)
+    add_index(cursor, "team_chat_messages", "idx_team_chat_room_id", "team_request_id, id")
+    print("- team_chat_messages table checked.")
+
+    # Ensure join_requests.phone can store long links (e.g., LinkedIn URLs)
+    cursor.execute("ALTER TABLE join_requests MODIFY COLUMN phone VARCHAR(100)")
+
+    # Ensure existing users table has all columns (Migration logic)
+    # This handles cases where the table exists but is missing newer columns
+    columns_to_ensure = [
+        ("profile_photo", "VARCHAR(255) DEFAULT 'default.jpg'"),
+        ("bio", "TEXT"),
+        ("skills", "TEXT"),
+        ("linkedin_url", "VARCHAR(255)"),
+        ("github_url", "VARCHAR(255)"),
+        ("branch", "VARCHAR(50)"),
+        ("year", "VARCHAR(20)"),
+        ("section", "VARCHAR(10)"),
+        ("interests", "TEXT"),
+        ("portfolio_url", "VARCHAR(255)"),
+        ("medium_url", "VARCHAR(255)"),
+    ]
+
+    print("Verifying user table columns...")
+    for col_name, col_type in columns_to_ensure:
+        add_column(cursor, "users", col_name, col_type)
+
+    # Ensure critical users column sizes (hashed password, email)
+    cursor.execute("ALTER TABLE users MODIFY COLUMN password VARCHAR(255)")
+    cursor.execute("ALTER TABLE users MODIFY COLUMN email VARCHAR(255)")
+
+    # No name: applies to the database the connection is using
+    cursor.execute("ALTER DATABASE CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    for t in [
+        "users","events","otp_codes","personal_projects","project_requests","follows","project_comments",
+        "faculty_collaborations","collaboration_requests","event_registrations","event_team_members",
+        "clubs","club_announcements","team_requests","join_requests","event_questions",
+        "collaboration_comments"
+    ]:
+        cursor.execute(f"ALTER TABLE {t} CONVERT TO CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+
+    # FULLTEXT indexes for ranked search (see utils/search.py); created after the
+    # charset conversion since every column in one index must share a collation
+    for table, idx_name, idx_cols in FULLTEXT_INDEXES:
+        add_index(cursor, table, idx_name, idx_cols, kind="FULLTEXT")
+    print("- search indexes checked.")
+
+    # Normalized skill token tables used for matching (see utils/skill_index.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_skills (
+            user_id INT NOT NULL,
+            skill VARCHAR(100) NOT NULL,
+            PRIMARY KEY (user_id, skill),
+            KEY idx_user_skills_skill (skill, user_id),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS team_request_skills (
+            team_request_id INT NOT NULL,
+            source ENUM('domain','skill') NOT NULL,
+            skill VARCHAR(100) NOT NULL,
+            PRIMARY KEY (team_request_id, source, skill),
+            KEY idx_team_request_skills_skill (skill, source, team_request_id),
+            FOREIGN KEY (team_request_id) REFERENCES team_requests(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS collaboration_skills (
+            collaboration_id INT NOT NULL,
+            kind ENUM('must','nice','general') NOT NULL,
+            skill VARCHAR(100) NOT NULL,
+            PRIMARY KEY (collaboration_id, kind, skill),
+            KEY idx_collaboration_skills_skill (skill, collaboration_id),
+            FOREIGN KEY (collaboration_id) REFERENCES faculty_collaborations(id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+    cursor.execute("DELETE FROM user_skills")
+    cursor.execute("SELECT id, skills, interests FROM users")
+    rows = [(user_id, t) for user_id, skills, interests in cursor.fetchall()
+            for t in sorted(_skill_tokens(skills, interests))]
+    if rows:
+        cursor.executemany("INSERT INTO user_skills (user_id, skill) VALUES (%s, %s)", rows)
+
+    cursor.execute("DELETE FROM team_request_skills")
+    cursor.execute("SELECT id, domain, required_skills FROM team_requests")
+    rows = []
+    for tr_id, domain, required_skills in cursor.fetchall():
+        rows += [(tr_id, 'domain', t) for t in sorted(_skill_tokens(domain))]
+        rows += [(tr_id, 'skill', t) for t in sorted(_skill_tokens(required_skills))]
+    if rows:
+        cursor.executemany(
+            "INSERT INTO team_request_skills (team_request_id, source, skill) VALUES (%s, %s, %s)", rows
+        )
+
+    cursor.execute("DELETE FROM collaboration_skills")
+    cursor.execute("SELECT id, required_skills_must, required_skills_nice, required_skills FROM faculty_collaborations")
+    rows = []
+    for collab_id, must, nice, general in cursor.fetchall():
+        for kind, value in (('must', must), ('nice', nice), ('general', general)):
+            rows += [(collab_id, kind, t) for t in sorted(_skill_tokens(value))]
+    if rows:
+        cursor.executemany(
+            "INSERT INTO collaboration_skills (collaboration_id, kind, skill) VALUES (%s, %s, %s)", rows
+        )
+    print("- skill index tables rebuilt.")
@@ -0,0 +1,37 @@
+"""Store every email lower-cased and index the columns teams, members and
+questions are joined on, so LOWER()/COLLATE comparisons can become indexed
+equality (users.email is already UNIQUE)."""
+from backend.migrations import add_index
+
+EMAIL_COLUMNS = [
+    ("users", "email"),
+    ("team_requests", "email"),
+    ("join_requests", "email"),
+    ("event_team_members", "member_email"),
+    ("event_questions", "student_email"),
+    ("otp_codes", "email"),
+]
+
+INDEXES = [
+    ("team_requests", "idx_team_requests_email_event", "email, event_id"),
+    ("join_requests", "idx_join_requests_email_status", "email, status"),
+    ("join_requests", "idx_join_requests_team_email", "team_request_id, email"),
+    ("event_team_members", "idx_event_team_members_email", "member_email, registration_id"),
+    ("event_questions", "idx_event_questions_event_student", "event_id, student_email"),
+]
+
+def upgrade(cursor):
+    # Same collation as users.email so joins need no COLLATE cast
+    cursor.execute("""
+        ALTER TABLE event_questions
+        MODIFY COLUMN student_email VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+    """)
+    for table, column in EMAIL_COLUMNS:
+        # The columns use a case-insensitive collation, so compare bytes to
+        # find rows that still need rewriting
+        cursor.execute(f"""
+            UPDATE {table} SET {column} = LOWER(TRIM({column}))
+            WHERE {column} IS NOT NULL AND BINARY {column} != BINARY LOWER(TRIM({column}))
+        """)
+    for table, name, columns in INDEXES:
+        add_index(cursor, table, name, columns)
@@ -0,0 +1,44 @@
+"""Link team requests and join requests to users by id.
+
+owner_user_id / member_user_id replace the email strings as the join key for
+ownership and membership checks; rows whose email has no account stay NULL.
+Both reference users(id) and are set to NULL when the account is deleted.
+"""
+from backend.migrations import add_column, add_foreign_key, add_index
+
+def upgrade(cursor):
+    add_column(cursor, "team_requests", "owner_user_id", "INT NULL")
+    add_column(cursor, "join_requests", "member_user_id", "INT NULL")
+
+    cursor.execute("""
+        UPDATE team_requests tr
+        JOIN users u ON u.email = tr.email
+        SET tr.owner_user_id = u.id
+        WHERE tr.owner_user_id IS NULL
+    """)
+    cursor.execute("""
+        UPDATE join_requests jr
+        JOIN users u ON u.email = jr.email
+        SET jr.member_user_id = u.id
+        WHERE jr.member_user_id IS NULL
+    """)
+
+    add_index(cursor, "team_requests", "idx_team_requests_owner_event", "owner_user_id, event_id")
+    add_index(cursor, "join_requests", "idx_join_requests_team_member_status", "team_request_id, member_user_id, status")
+    add_index(cursor, "join_requests", "idx_join_requests_member_status", "member_user_id, status")
+
+    # Ids whose account is already gone would fail the constraint
+    cursor.execute("""
+        UPDATE team_requests tr LEFT JOIN users u ON u.id = tr.owner_user_id
+        SET tr.owner_user_id = NULL
+        WHERE tr.owner_user_id IS NOT NULL AND u.id IS NULL
+    """)
+    cursor.execute("""
+        UPDATE join_requests jr LEFT JOIN users u ON u.id = jr.member_user_id
+        SET jr.member_user_id = NULL
+        WHERE jr.member_user_id IS NOT NULL AND u.id IS NULL
+    """)
+    add_foreign_key(cursor, "team_requests", "fk_team_requests_owner_user",
+                    "owner_user_id", "users(id)", on_delete="SET NULL")
+    add_foreign_key(cursor, "join_requests", "fk_join_requests_member_user",
+                    "member_user_id", "users(id)", on_delete="SET NULL")
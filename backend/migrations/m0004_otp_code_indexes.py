@@ -0,0 +1,11 @@
+"""Index otp_codes for the verify lookup and the expiry purge.
+
+register_verify / reset_password look a code up by (email, purpose,
+code_hash); the maintenance job deletes rows by expires_at and used.
+"""
+from backend.migrations import add_index
+
+def upgrade(cursor):
+    add_index(cursor, "otp_codes", "idx_otp_codes_lookup", "email, purpose, code_hash")
+    add_index(cursor, "otp_codes", "idx_otp_codes_expires", "expires_at")
+    add_index(cursor, "otp_codes", "idx_otp_codes_used", "used")
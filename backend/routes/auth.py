@@ -9,13 +9,35 @@ import ssl
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 from dotenv import load_dotenv
-from backend.utils.email_sender import send_email, smtp_missing_keys
+from backend.utils.email_sender import smtp_missing_keys
+from backend.utils.email_outbox import enqueue_email, notify_email_worker
 from backend.utils.env_manager import update_env_file
+from backend.utils.emails import normalize_email
+from backend.utils.rate_limit import TokenBucket
+from backend.config import APP_CONFIG
 
 load_dotenv()
 
 auth_bp = Blueprint('auth', __name__)
 
+# Per-email limits on sending codes (mail volume) and on checking them
+# (guessing a 6-digit code)
+otp_send_limit = TokenBucket(
+    APP_CONFIG.get("OTP_SEND_BURST", 3), APP_CONFIG.get("OTP_SEND_INTERVAL", 60),
+    APP_CONFIG.get("RATE_LIMIT_SIZE", 10000)
+)
+otp_verify_limit = TokenBucket(
+    APP_CONFIG.get("OTP_VERIFY_BURST", 5), APP_CONFIG.get("OTP_VERIFY_INTERVAL", 30),
+    APP_CONFIG.get("RATE_LIMIT_SIZE", 10000)
+)
+
+def otp_rate_limited(limit, email):
+    """Flash and return True when ``email`` has used up its bucket."""
+    if limit.consume(email):
+        return False
+    flash(f"Too many attempts. Please try again in {limit.retry_after(email)} seconds.", "warning")
+    return True
+
 def is_college_email(email: str) -> bool:
     try:
         e = (email or "").strip().lower()
@@ -32,28 +54,6 @@ def generate_otp():
     return f"{random.randint(100000, 999999)}"
 def hash_otp(email, code):
     return hashlib.sha256((email.lower().strip() + ":" + code).encode()).hexdigest()
-def ensure_otp_table_exists():
-    try:
-        c = db.cursor()
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS otp_codes (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                email VARCHAR(255) NOT NULL,
-                code_hash VARCHAR(255) NOT NULL,
-                purpose ENUM('password_reset','registration') NOT NULL,
-                expires_at DATETIME NOT NULL,
-                used TINYINT(1) DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        db.commit()
-        c.close()
-    except Exception as e:
-        try:
-            db.rollback()
-        except Exception:
-            pass
-        current_app.logger.error("ensure_otp_table_exists failed: %s", e)
 
 # ------------------- LOGIN -------------------
 @auth_bp.route('/login', methods=['GET', 'POST'])
@@ -69,7 +69,7 @@ def login():
         return redirect(url_for('student.dashboard'))
 
     if request.method == 'POST':
-        email = request.form.get('email', '').strip()
+        email = normalize_email(request.form.get('email'))
         password = request.form.get('password', '').strip()
 
         if not email or not password:
@@ -110,7 +110,7 @@ def login():
             session.clear()
             session.permanent = True
             session['user_id'] = user['id']
-            session['user_email'] = user['email']   # ✅ FIX
+            session['user_email'] = normalize_email(user['email'])   # ✅ FIX
             session['user_name'] = user['name']
             session['role'] = user.get('role', 'student')
 
@@ -131,7 +131,7 @@ def login():
 @auth_bp.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
-        email = request.form.get('email', '').strip()
+        email = normalize_email(request.form.get('email'))
         if not email:
             flash("Enter your email to request OTP.", "danger")
             return redirect(url_for('auth.register'))
@@ -143,13 +143,20 @@ def register():
 def request_registration_otp():
     if request.method == 'GET':
         return redirect(url_for('auth.register'))
-    email = request.form.get('email', '').strip()
+    email = normalize_email(request.form.get('email'))
     if not email:
         flash("Enter email to send OTP.", "warning")
         return redirect(url_for('auth.register'))
     if not is_college_email(email):
         flash("Please use your college email address.", "warning")
         return redirect(url_for('auth.register'))
+    # Nothing queued could ever be delivered
+    missing = smtp_missing_keys()
+    if missing:
+        flash(f"Email sending misconfigured: {', '.join(missing)} not set.", "danger")
+        return redirect(url_for('auth.register'))
+    if otp_rate_limited(otp_send_limit, email):
+        return redirect(url_for('auth.register'))
     try:
         c0 = db.cursor()
         c0.execute("SELECT id FROM users WHERE email=%s", (email,))
@@ -161,14 +168,15 @@ def request_registration_otp():
         code = generate_otp()
         h = hash_otp(email, code)
         expires = datetime.now() + timedelta(minutes=10)
-        ensure_otp_table_exists()
         c = db.cursor()
         c.execute("""
             INSERT INTO otp_codes (email, code_hash, purpose, expires_at)
             VALUES (%s,%s,'registration',%s)
         """, (email, h, expires.strftime('%Y-%m-%d %H:%M:%S')))
+        enqueue_email(c, email, "Your Anveshan Registration OTP", f"Your OTP is {code}. It expires in 10 minutes.")
         db.commit()
         c.close()
+        notify_email_worker()
     except Error as e:
         try:
             db.rollback()
@@ -181,28 +189,14 @@ def request_registration_otp():
         current_app.logger.error("Registration OTP unexpected error: %s", e)
         flash("Unexpected server error while generating OTP. Please try again later.", "danger")
         return redirect(url_for('auth.register'))
-    missing = smtp_missing_keys()
-    if missing:
-        flash(f"Email sending misconfigured: {', '.join(missing)} not set.", "danger")
-        return redirect(url_for('auth.register_verify', email=email))
-    sent = send_email(email, "Your Anveshan Registration OTP", f"Your OTP is {code}. It expires in 10 minutes.")
-    if sent:
-        flash("OTP sent to your email. Enter it to set your password.", "info")
-    else:
-        # Don't expose config errors to user, just generic error
-        err = current_app.config.get("SMTP_LAST_ERROR")
-        if current_app.debug and err:
-            flash(f"Email failed: {err}", "danger")
-        else:
-            flash("Unable to send email. Please try again later or contact support.", "danger")
-        current_app.logger.error("Failed to send registration OTP to %s. Check SMTP config.", email)
+    flash("Your OTP is on its way and should arrive within a few minutes. Enter it to set your password.", "info")
     return redirect(url_for('auth.register_verify', email=email))
 
 @auth_bp.route('/register/verify', methods=['GET', 'POST'])
 def register_verify():
     if request.method == 'POST':
         name = request.form.get('name', '').strip()
-        email = request.form.get('email', '').strip()
+        email = normalize_email(request.form.get('email'))
         otp = request.form.get('otp', '').strip()
         password = request.form.get('password', '').strip()
         role = request.form.get('role', 'student')
@@ -215,6 +209,8 @@ def register_verify():
         if role in {'student', 'faculty'} and not is_college_email(email):
             flash("Please use your college email address.", "warning")
             return redirect(url_for('auth.register_verify', email=email))
+        if otp_rate_limited(otp_verify_limit, email):
+            return redirect(url_for('auth.register_verify', email=email))
         cur = db.cursor(dictionary=True)
         cur.execute("""
             SELECT id, expires_at, used FROM otp_codes
@@ -253,10 +249,16 @@ def register_verify():
 @auth_bp.route('/forgot-password', methods=['GET', 'POST'])
 def forgot_password():
     if request.method == 'POST':
-        email = request.form.get('email', '').strip()
+        email = normalize_email(request.form.get('email'))
         if not email:
             flash("Enter your email.", "warning")
             return redirect(url_for('auth.forgot_password'))
+        missing = smtp_missing_keys()
+        if missing:
+            flash(f"Email sending misconfigured: {', '.join(missing)} not set.", "danger")
+            return redirect(url_for('auth.forgot_password'))
+        if otp_rate_limited(otp_send_limit, email):
+            return redirect(url_for('auth.forgot_password'))
         c = db.cursor()
         c.execute("SELECT id FROM users WHERE email=%s", (email,))
         exists = c.fetchone()
@@ -272,35 +274,25 @@ def forgot_password():
             INSERT INTO otp_codes (email, code_hash, purpose, expires_at)
             VALUES (%s,%s,'password_reset',%s)
         """, (email, h, expires.strftime('%Y-%m-%d %H:%M:%S')))
+        enqueue_email(c, email, "Your Anveshan Password Reset OTP", f"Your OTP is {code}. It expires in 10 minutes.")
         db.commit()
         c.close()
-        missing = smtp_missing_keys()
-        if missing:
-            flash(f"Email sending misconfigured: {', '.join(missing)} not set.", "danger")
-            return redirect(url_for('auth.reset_password', email=email))
-        sent = send_email(email, "Your Anveshan Password Reset OTP", f"Your OTP is {code}. It expires in 10 minutes.")
-        if sent:
-            flash("OTP sent to your email.", "info")
-            return redirect(url_for('auth.reset_password', email=email))
-        else:
-            err = current_app.config.get("SMTP_LAST_ERROR")
-            if current_app.debug and err:
-                flash(f"Email failed: {err}", "danger")
-            else:
-                flash("Unable to send email. Please try again later.", "danger")
-            current_app.logger.error("Failed to send password reset OTP to %s. Check SMTP config.", email)
-            return redirect(url_for('auth.forgot_password'))
+        notify_email_worker()
+        flash("Your OTP is on its way and should arrive within a few minutes.", "info")
+        return redirect(url_for('auth.reset_password', email=email))
     return render_template('forgot_password.html')
 
 @auth_bp.route('/reset-password', methods=['GET', 'POST'])
 def reset_password():
     if request.method == 'POST':
-        email = request.form.get('email', '').strip()
+        email = normalize_email(request.form.get('email'))
         otp = request.form.get('otp', '').strip()
         new_password = request.form.get('password', '').strip()
         if not email or not otp or not new_password:
             flash("Enter email, OTP, and new password.", "danger")
             return redirect(url_for('auth.reset_password'))
+        if otp_rate_limited(otp_verify_limit, email):
+            return redirect(url_for('auth.reset_password', email=email))
         cursor = db.cursor(dictionary=True)
         cursor.execute("""
             SELECT id, expires_at, used FROM otp_codes
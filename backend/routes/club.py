@@ -4,6 +4,9 @@ from datetime import datetime, timedelta
 import os
 from werkzeug.utils import secure_filename
 from flask import current_app
+from backend.utils.event_filters import normalize_target_years, parse_date
+from backend.utils.schema import has_column
+from backend.utils.club_stats import STATS_COLUMNS, get_club_stats, record_event_created, invalidate_club_stats
 
 club_bp = Blueprint('club', __name__)
 
@@ -13,22 +16,11 @@ def allowed_file(filename):
 def get_event_stats(cursor, club_id, event_type):
     """Helper function to get statistics for a specific event type"""
     try:
-        def column_exists(col):
-            cursor.execute("""
-                SELECT COUNT(*) AS total
-                FROM information_schema.COLUMNS 
-                WHERE BINARY TABLE_SCHEMA = BINARY DATABASE() 
-                  AND TABLE_NAME = 'events' 
-                  AND COLUMN_NAME = %s
-            """, (col,))
-            res = cursor.fetchone()
-            return (res and res.get('total', 0) > 0)
-
-        has_event_type = column_exists('event_type')
-        has_created_by = column_exists('created_by')
-        has_deadline = column_exists('deadline')
-        has_start_time = column_exists('start_time')
-        has_end_time = column_exists('end_time')
+        has_event_type = has_column('events', 'event_type')
+        has_created_by = has_column('events', 'created_by')
+        has_deadline = has_column('events', 'deadline')
+        has_start_time = has_column('events', 'start_time')
+        has_end_time = has_column('events', 'end_time')
 
         where_clause = []
         params = []
@@ -96,26 +88,34 @@ def club_dashboard():
     cursor = db.cursor(dictionary=True)
 
     try:
-        # Get stats for each event type
-        hackathon_stats = get_event_stats(cursor, club_id, 'hackathon')
-        event_stats = get_event_stats(cursor, club_id, 'event')
-        techtalk_stats = get_event_stats(cursor, club_id, 'techtalk')
-        
-        # Get total registrations across all events
-        cursor.execute("""
-            SELECT COUNT(*) AS total
-            FROM event_registrations er
-            JOIN events e ON er.event_id = e.id
-            WHERE e.created_by = %s
-        """, (club_id,))
-        total_registrations = cursor.fetchone()['total']
+        if all(has_column('events', c) for c in STATS_COLUMNS):
+            # Precomputed per-club aggregate; no table scans on a warm cache
+            club_stats = get_club_stats(cursor, club_id)
+            hackathon_stats = club_stats.event_stats('hackathon')
+            event_stats = club_stats.event_stats('event')
+            techtalk_stats = club_stats.event_stats('techtalk')
+            total_registrations = club_stats.registrations
+        else:
+            # Get stats for each event type
+            hackathon_stats = get_event_stats(cursor, club_id, 'hackathon')
+            event_stats = get_event_stats(cursor, club_id, 'event')
+            techtalk_stats = get_event_stats(cursor, club_id, 'techtalk')
+
+            # Get total registrations across all events
+            cursor.execute("""
+                SELECT COUNT(*) AS total
+                FROM event_registrations er
+                JOIN events e ON er.event_id = e.id
+                WHERE e.created_by = %s
+            """, (club_id,))
+            total_registrations = cursor.fetchone()['total']
 
         # Get recent questions (last 30 days)
         cursor.execute("""
             SELECT q.*, e.title AS event_title, e.event_type, u.name AS student_name
             FROM event_questions q
             JOIN events e ON q.event_id = e.id
-            LEFT JOIN users u ON u.email = (q.student_email COLLATE utf8mb4_unicode_ci)
+            LEFT JOIN users u ON u.email = q.student_email
             WHERE e.created_by = %s
               AND q.created_at >= %s
             ORDER BY q.created_at DESC
@@ -169,6 +169,10 @@ def post_announcement():
     if not title or not external_registration_link or not registration_end_date:
         flash("Please provide title, registration end date and registration link.", "danger")
         return redirect(url_for('club.club_dashboard'))
+    registration_end_date = parse_date(registration_end_date)
+    if registration_end_date is None:
+        flash("Please provide a valid registration end date.", "danger")
+        return redirect(url_for('club.club_dashboard'))
 
     poster_file = request.files.get('poster')
     poster_path = None
@@ -188,12 +192,15 @@ def post_announcement():
             cursor.execute("SELECT name FROM users WHERE id = %s AND role = 'club'", (session['user_id'],))
             u = cursor.fetchone()
             organizer_name = (u and (u.get('name') if isinstance(u, dict) else u[0])) or None
-        cursor.execute("""
-            INSERT INTO events
-            (title, event_type, description, deadline, organizer, created_by, poster_path, external_registration_link, target_years)
-            VALUES (%s, 'hackathon', %s, %s, %s, %s, %s, %s, %s)
-        """, (title, description, registration_end_date, organizer_name, session['user_id'], poster_path, external_registration_link, target_years))
+        insert_cols = ['title', 'event_type', 'description', 'deadline', 'organizer', 'created_by', 'poster_path', 'external_registration_link', 'target_years']
+        values = [title, 'hackathon', description, registration_end_date, organizer_name, session['user_id'], poster_path, external_registration_link, target_years]
+        if has_column('events', 'target_years_norm'):
+            insert_cols.append('target_years_norm'); values.append(normalize_target_years(target_years))
+        cols_sql = ", ".join(insert_cols)
+        ph_sql = ", ".join(["%s"] * len(values))
+        cursor.execute(f"INSERT INTO events ({cols_sql}) VALUES ({ph_sql})", tuple(values))
         db.commit()
+        record_event_created(session['user_id'], 'hackathon', deadline=registration_end_date)
         flash("Announcement posted. Students in targeted years will see it.", "success")
     except Exception as e:
         db.rollback()
@@ -214,22 +221,12 @@ def edit_announcements_page():
     club_id = session['user_id']
     cursor = db.cursor(dictionary=True)
     try:
-        def column_exists(col):
-            cursor.execute("""
-                SELECT COUNT(*) AS total
-                FROM information_schema.COLUMNS 
-                WHERE TABLE_SCHEMA = DATABASE() 
-                  AND TABLE_NAME = 'events' 
-                  AND COLUMN_NAME = %s
-            """, (col,))
-            res = cursor.fetchone()
-            return (res and res.get('total', 0) > 0)
-        has_event_type = column_exists('event_type')
-        has_created_by = column_exists('created_by')
-        has_deadline = column_exists('deadline')
-        has_start_time = column_exists('start_time')
-        has_end_time = column_exists('end_time')
-        has_created_at = column_exists('created_at')
+        has_event_type = has_column('events', 'event_type')
+        has_created_by = has_column('events', 'created_by')
+        has_deadline = has_column('events', 'deadline')
+        has_start_time = has_column('events', 'start_time')
+        has_end_time = has_column('events', 'end_time')
+        has_created_at = has_column('events', 'created_at')
         where_clause = []
         params = []
         if has_created_by:
@@ -347,6 +344,10 @@ def update_announcement(event_id):
     if not title or not external_registration_link or not registration_end_date:
         flash("Please provide title, registration end date and registration link.", "danger")
         return redirect(url_for('club.edit_announcement', event_id=event_id))
+    registration_end_date = parse_date(registration_end_date)
+    if registration_end_date is None:
+        flash("Please provide a valid registration end date.", "danger")
+        return redirect(url_for('club.edit_announcement', event_id=event_id))
     poster_file = request.files.get('poster')
     poster_path_set = None
     if poster_file and poster_file.filename and allowed_file(poster_file.filename):
@@ -357,13 +358,19 @@ def update_announcement(event_id):
         poster_path_set = os.path.join('uploads', 'hackathons', filename).replace("\\", "/")
     cursor = db.cursor()
     try:
-        params = [title, description, registration_end_date, external_registration_link, target_years, event_id]
+        params = [title, description, registration_end_date, external_registration_link, target_years]
         set_clause = "title=%s, description=%s, deadline=%s, external_registration_link=%s, target_years=%s"
         if poster_path_set:
             set_clause += ", poster_path=%s"
-            params = [title, description, registration_end_date, external_registration_link, target_years, poster_path_set, event_id]
+            params.append(poster_path_set)
+        if has_column('events', 'target_years_norm'):
+            set_clause += ", target_years_norm=%s"
+            params.append(normalize_target_years(target_years))
+        params.append(event_id)
         cursor.execute(f"UPDATE events SET {set_clause} WHERE id=%s", tuple(params))
         db.commit()
+        # The deadline may have moved; rebuild this club's numbers on next view
+        invalidate_club_stats(session['user_id'])
         flash("Hackathon updated successfully.", "success")
     except Exception as e:
         db.rollback()
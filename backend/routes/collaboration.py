@@ -1,19 +1,100 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, get_template_attribute
 from backend.db import db
+from backend.utils.current_user import get_current_user, invalidate_user
 import os
 from werkzeug.utils import secure_filename
-import re
 from datetime import datetime, date
-from backend.utils.skills import expand_skills, all_known_terms
+from backend.utils.skills import expand_skills, find_known_terms
+from backend.utils.skill_index import skill_tokens, sync_user_skills, sync_collaboration_skills
+from backend.utils.skill_fuzzy import fuzzy_expand
+from backend.utils.skill_scoring import RequirementProfile, candidate_pool, rank_candidates, split_terms
+from backend.utils.sql import in_clause, encode_cursor, decode_cursor
+from backend.utils.capacity import accept_collaboration_request, ACCEPTED, FULL
+from backend.utils.schema import table_columns
 
 collaboration_bp = Blueprint('collaboration', __name__)
 
-def _expand_split(terms):
-    out = []
-    for t in terms:
-        parts = [p.strip() for p in re.split(r'[/&]|\band\b', t) if p.strip()]
-        out.extend(parts if parts else [t])
-    return out
+COMMUNITY_PAGE_SIZE = 24
+PROFILE_FIELDS = "id, name, role, bio, skills, interests, profile_photo, github_url, linkedin_url, portfolio_url, medium_url"
+
+def _community_filter_tokens(cursor, user, show_all):
+    """Skill tokens used to recommend people, or an empty set to show everyone.
+
+    Logic: if the user has posted projects, filter people by those projects'
+    requirements; faculty also match on their own skills/interests.
+    """
+    if show_all:
+        return set()
+
+    cursor.execute("SELECT tech_stack, domain FROM personal_projects WHERE user_id = %s", (session['user_id'],))
+    filter_keywords = []
+    for p in cursor.fetchall():
+        if p['tech_stack']:
+            filter_keywords.extend(expand_skills(p['tech_stack'].split(',')))
+        if p['domain']:
+            filter_keywords.append(p['domain'])
+
+    if user and user.get('role') == 'faculty':
+        filter_keywords.extend(expand_skills((user.get('skills') or '').split(',')))
+        filter_keywords.extend(expand_skills((user.get('interests') or '').split(',')))
+
+    return fuzzy_expand(cursor, skill_tokens(",".join(set(filter_keywords))))
+
+def _profile_page(cursor, filter_tokens, cursor_token=None, limit=COMMUNITY_PAGE_SIZE):
+    """One page of profiles ordered by (name, id); returns (rows, next_cursor)."""
+    sql = f"SELECT {PROFILE_FIELDS} FROM users WHERE role IN ('student', 'faculty') AND id != %s"
+    params = [session['user_id']]
+    if filter_tokens:
+        ph, token_params = in_clause(sorted(filter_tokens))
+        sql += f" AND id IN (SELECT user_id FROM user_skills WHERE skill IN ({ph}))"
+        params.extend(token_params)
+    after = decode_cursor(cursor_token, 2)
+    if after:
+        # NULL names sort first, so a NULL-name cursor is followed by the
+        # remaining NULL names and then every named profile.
+        if after[0] is None:
+            sql += " AND (name IS NOT NULL OR id > %s)"
+            params.append(after[1])
+        else:
+            sql += " AND (name > %s OR (name = %s AND id > %s))"
+            params.extend([after[0], after[0], after[1]])
+    sql += " ORDER BY name ASC, id ASC LIMIT %s"
+    params.append(limit + 1)
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor((rows[-1]['name'], rows[-1]['id']))
+    return rows, next_cursor
+
+def _project_page(cursor, cursor_token=None, limit=COMMUNITY_PAGE_SIZE):
+    """One page of projects, newest first by (created_at, id); returns (rows, next_cursor)."""
+    sql = """
+        SELECT p.*, u.name as creator_name, u.profile_photo as creator_photo
+        FROM personal_projects p
+        JOIN users u ON p.user_id = u.id
+    """
+    params = []
+    after = decode_cursor(cursor_token, 2)
+    if after:
+        # NULL created_at sorts last under DESC, so undated projects follow
+        # every dated one
+        if after[0] is None:
+            sql += " WHERE p.created_at IS NULL AND p.id < %s"
+            params.append(after[1])
+        else:
+            sql += " WHERE (p.created_at < %s OR (p.created_at = %s AND p.id < %s) OR p.created_at IS NULL)"
+            params.extend([after[0], after[0], after[1]])
+    sql += " ORDER BY p.created_at DESC, p.id DESC LIMIT %s"
+    params.append(limit + 1)
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor((rows[-1]['created_at'], rows[-1]['id']))
+    return rows, next_cursor
 
 @collaboration_bp.route('/community')
 def community():
@@ -23,84 +104,58 @@ def community():
     cursor = db.cursor(dictionary=True)
     
     # Fetch logged-in user for sidebar
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
-
-    # Determine if we should filter profiles
-    # Logic: If user has posted projects, filter people by those projects' requirements.
-    # Otherwise, show all.
-    
+    user = get_current_user()
     show_all = request.args.get('show_all') == 'true'
 
-    # 1. Get user's projects to find keywords
-    cursor.execute("SELECT tech_stack, domain FROM personal_projects WHERE user_id = %s", (session['user_id'],))
-    my_projects = cursor.fetchall()
-    
-    filter_keywords = []
-    if my_projects and not show_all:
-        for p in my_projects:
-            if p['tech_stack']:
-                filter_keywords.extend(expand_skills(p['tech_stack'].split(',')))
-            if p['domain']:
-                filter_keywords.append(p['domain'])
-        # Remove duplicates
-        filter_keywords = list(set(filter_keywords))
-
-    # For faculty, also use their own skills/interests as matching signals
-    if not show_all:
-        if user and user.get('role') == 'faculty':
-            skills_terms = expand_skills((user.get('skills') or '').split(','))
-            interest_terms = expand_skills((user.get('interests') or '').split(','))
-            filter_keywords.extend(skills_terms + interest_terms)
-            filter_keywords = list(set(filter_keywords))
-
-    # 2. Fetch profiles based on filter
-    if filter_keywords:
-        query_parts = []
-        params = []
-        
-        # Always exclude self
-        base_query = """
-            SELECT id, name, role, bio, skills, interests, profile_photo, github_url, linkedin_url, portfolio_url, medium_url 
-            FROM users 
-            WHERE role IN ('student', 'faculty') AND id != %s
-        """
-        params.append(session['user_id'])
-        
-        keyword_conditions = []
-        for k in filter_keywords:
-            keyword_conditions.append("skills LIKE %s OR interests LIKE %s")
-            params.extend([f"%{k}%", f"%{k}%"])
-            
-        if keyword_conditions:
-            base_query += " AND (" + " OR ".join(keyword_conditions) + ")"
-            
-        base_query += " ORDER BY name ASC"
-        
-        cursor.execute(base_query, tuple(params))
-        profiles = cursor.fetchall()
-    else:
-        # No projects or no keywords or show_all=true -> Show all (except self)
-        cursor.execute("""
-            SELECT id, name, role, bio, skills, interests, profile_photo, github_url, linkedin_url, portfolio_url, medium_url 
-            FROM users 
-            WHERE role IN ('student', 'faculty') AND id != %s
-            ORDER BY name ASC
-        """, (session['user_id'],))
-        profiles = cursor.fetchall()
-
-    # Fetch all personal projects
-    cursor.execute("""
-        SELECT p.*, u.name as creator_name, u.profile_photo as creator_photo
-        FROM personal_projects p
-        JOIN users u ON p.user_id = u.id
-        ORDER BY p.created_at DESC
-    """)
-    projects = cursor.fetchall()
+    try:
+        filter_tokens = _community_filter_tokens(cursor, user, show_all)
+        profiles, profiles_cursor = _profile_page(cursor, filter_tokens)
+        projects, projects_cursor = _project_page(cursor)
+    finally:
+        cursor.close()
 
-    cursor.close()
+    return render_template(
+        'community.html',
+        user=user,
+        profiles=profiles,
+        projects=projects,
+        profiles_cursor=profiles_cursor,
+        projects_cursor=projects_cursor,
+        show_all=show_all,
+        is_filtered=bool(filter_tokens)
+    )
+
+@collaboration_bp.route('/api/community/<feed>')
+def community_feed(feed):
+    """Infinite-scroll pages for the community tabs: ?cursor=<token from the previous page>."""
+    if 'user_id' not in session:
+        return jsonify({'error': 'login required'}), 401
+    if feed not in ('profiles', 'projects'):
+        return jsonify({'error': 'unknown feed'}), 404
 
-    return render_template('community.html', user=user, profiles=profiles, projects=projects, is_filtered=bool(filter_keywords))
+    cursor_token = request.args.get('cursor')
+    cursor = db.cursor(dictionary=True)
+    try:
+        if feed == 'profiles':
+            filter_tokens = _community_filter_tokens(cursor, get_current_user(), request.args.get('show_all') == 'true')
+            rows, next_cursor = _profile_page(cursor, filter_tokens, cursor_token)
+            card = get_template_attribute('_community_cards.html', 'person_card')
+            html = "".join(str(card(r)) for r in rows)
+        else:
+            rows, next_cursor = _project_page(cursor, cursor_token)
+            card = get_template_attribute('_community_cards.html', 'project_card')
+            html = "".join(str(card(r, session['user_id'])) for r in rows)
+    except Exception as e:
+        print(f"Error loading community {feed}: {e}")
+        return jsonify({'error': 'could not load feed'}), 500
+    finally:
+        cursor.close()
+
+    return jsonify({
+        'items': rows,
+        'html': html,
+        'next_cursor': next_cursor
+    })
 
 # ===============================
 # FACULTY PROFILE
@@ -154,7 +209,9 @@ def faculty_profile():
             params.append(session['user_id'])
 
             cursor.execute(query, tuple(params))
+            sync_user_skills(cursor, session['user_id'], skills, interests)
             db.commit()
+            invalidate_user(session['user_id'])
             flash("Profile updated successfully!", "success")
         except Exception as e:
             db.rollback()
@@ -163,8 +220,7 @@ def faculty_profile():
         
         return redirect(url_for('collaboration.faculty_profile'))
 
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
     cursor.close()
 
     return render_template('faculty_profile.html', user=user)
@@ -175,8 +231,7 @@ def create_project():
         return redirect(url_for('auth.login'))
 
     cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     if request.method == 'POST':
         title = request.form.get('title')
@@ -194,9 +249,7 @@ def create_project():
                 apply_deadline = None
 
         try:
-            cursor.execute("SHOW COLUMNS FROM personal_projects")
-            cols = [c['Field'] if isinstance(c, dict) else c[0] for c in cursor.fetchall()]
-            available = set(cols)
+            available = table_columns('personal_projects')
             insert_cols = ['user_id','title','domain','description','tech_stack','looking_for']
             values = [session['user_id'], title, domain, description, tech_stack, looking_for]
             if 'apply_deadline' in available and apply_deadline is not None:
@@ -225,8 +278,7 @@ def project_details(project_id):
     cursor = db.cursor(dictionary=True)
     
     # Fetch user for sidebar
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     # Fetch project details
     cursor.execute("""
@@ -275,53 +327,16 @@ def project_details(project_id):
         if project['domain']:
             keywords.append(project['domain'])
         
-        if keywords:
-            # Build dynamic SQL query
-            query_parts = []
-            params = [session['user_id']] # Exclude self
-            
-            for k in keywords:
-                query_parts.append("skills LIKE %s OR interests LIKE %s")
-                params.extend([f"%{k}%", f"%{k}%"])
-            
-            where_clause = " OR ".join(query_parts)
-            
-            sql = f"""
-                SELECT id, name, role, skills, interests, profile_photo 
-                FROM users 
-                WHERE id != %s AND role = 'student' AND ({where_clause})
-                LIMIT 6
-            """
-            
+        keyword_tokens = skill_tokens(",".join(keywords))
+        if keyword_tokens:
+            fuzzy_cursor = db.cursor(dictionary=True)
+            keyword_tokens = fuzzy_expand(fuzzy_cursor, keyword_tokens)
+            fuzzy_cursor.close()
+        if keyword_tokens:
             cursor = db.cursor(dictionary=True) 
-            cursor.execute(sql, tuple(params))
-            recommended_users = cursor.fetchall()
-            base_terms = []
-            if project.get('tech_stack'):
-                base_terms.extend([t.strip().lower() for t in str(project['tech_stack']).split(',') if t.strip()])
-            if project.get('domain'):
-                base_terms.append(str(project['domain']).strip().lower())
-            split_terms = []
-            for t in base_terms:
-                parts = [p.strip() for p in re.split(r'[/&]|\band\b', t) if p.strip()]
-                split_terms.extend(parts if parts else [t])
-            base_terms = split_terms
-            for u in recommended_users:
-                user_terms = []
-                if u.get('skills'):
-                    base_ut = [s.strip().lower() for s in str(u['skills']).split(',') if s.strip()]
-                    user_terms.extend(_expand_split(base_ut))
-                if u.get('interests'):
-                    base_ui = [s.strip().lower() for s in str(u['interests']).split(',') if s.strip()]
-                    user_terms.extend(_expand_split(base_ui))
-                user_terms_exp = set(expand_skills(user_terms))
-                match_count = 0
-                total = len(base_terms)
-                for bt in base_terms:
-                    exp_bt = set(expand_skills([bt]))
-                    if exp_bt & user_terms_exp:
-                        match_count += 1
-                u['match_percent'] = int(round(100 * match_count / total)) if total > 0 else 0
+            candidates = candidate_pool(cursor, 'student', session['user_id'], keyword_tokens)
+            profile = RequirementProfile(general=split_terms(project.get('tech_stack'), project.get('domain')))
+            recommended_users = rank_candidates(profile, candidates, limit=6)
             cursor.close()
     else:
         # Check if current user has already requested to join
@@ -393,8 +408,7 @@ def edit_project(project_id):
         return redirect(url_for('collaboration.community'))
 
     # Fetch user for sidebar
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     if request.method == 'POST':
         title = request.form.get('title')
@@ -412,9 +426,7 @@ def edit_project(project_id):
                 apply_deadline = None
 
         try:
-            cursor.execute("SHOW COLUMNS FROM personal_projects")
-            cols = [c['Field'] if isinstance(c, dict) else c[0] for c in cursor.fetchall()]
-            available = set(cols)
+            available = table_columns('personal_projects')
             set_parts = ["title=%s","domain=%s","description=%s","tech_stack=%s","looking_for=%s"]
             values = [title, domain, description, tech_stack, looking_for]
             if 'apply_deadline' in available:
@@ -444,8 +456,7 @@ def view_profile(profile_id):
     cursor = db.cursor(dictionary=True)
     
     # Fetch logged-in user for sidebar
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     # Fetch target profile
     cursor.execute("""
@@ -588,8 +599,7 @@ def faculty_dashboard():
     cursor = db.cursor(dictionary=True)
     
     # 1. Verify Faculty Role
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
     
     if not user or user['role'] != 'faculty':
         flash("Access denied. Faculty only area.", "danger")
@@ -675,9 +685,9 @@ def respond_invitation(req_id, action):
     cursor = db.cursor(dictionary=True)
     try:
         cursor.execute("""
-            SELECT cr.id, cr.user_id, cr.collaboration_id, cr.status, fc.max_students, fc.max_faculty
+            SELECT cr.id, cr.user_id, cr.collaboration_id, cr.status, u.role
             FROM collaboration_requests cr
-            JOIN faculty_collaborations fc ON cr.collaboration_id = fc.id
+            JOIN users u ON cr.user_id = u.id
             WHERE cr.id = %s
         """, (req_id,))
         req = cursor.fetchone()
@@ -685,19 +695,16 @@ def respond_invitation(req_id, action):
             flash("Unauthorized or invalid request.", "danger")
             return redirect(url_for('collaboration.faculty_dashboard'))
         if action == 'accepted':
-            cursor.execute("SELECT role FROM users WHERE id = %s", (req['user_id'],))
-            applicant = cursor.fetchone()
-            cursor.execute("""
-                SELECT COUNT(*) as count FROM collaboration_requests cr
-                JOIN users u ON cr.user_id = u.id
-                WHERE cr.collaboration_id = %s AND cr.status = 'accepted' AND u.role = %s
-            """, (req['collaboration_id'], applicant['role']))
-            current_count = cursor.fetchone()['count']
-            limit = req['max_students'] if applicant['role'] == 'student' else req['max_faculty']
-            if current_count >= limit:
-                flash(f"Limit reached for {applicant['role']}s. Cannot accept.", "warning")
+            result = accept_collaboration_request(cursor, req_id, req['collaboration_id'], req['role'])
+            if result != ACCEPTED:
+                db.rollback()
+                if result == FULL:
+                    flash(f"Limit reached for {req['role']}s. Cannot accept.", "warning")
+                else:
+                    flash("Unauthorized or invalid request.", "danger")
                 return redirect(url_for('collaboration.faculty_dashboard'))
-        cursor.execute("UPDATE collaboration_requests SET status = %s WHERE id = %s", (action, req_id))
+        else:
+            cursor.execute("UPDATE collaboration_requests SET status = %s WHERE id = %s AND status = 'pending'", (action, req_id))
         db.commit()
         flash(f"Invitation {action}.", "success")
     except Exception as e:
@@ -713,8 +720,7 @@ def create_faculty_collaboration():
         return redirect(url_for('auth.login'))
 
     cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     if not user or user['role'] != 'faculty':
         cursor.close()
@@ -750,9 +756,7 @@ def create_faculty_collaboration():
         required_skills = ", ".join([s for s in [required_skills_must, required_skills_nice] if s.strip()])
 
         try:
-            cursor.execute("SHOW COLUMNS FROM faculty_collaborations")
-            cols = [c['Field'] if isinstance(c, dict) else c[0] for c in cursor.fetchall()]
-            available = set(cols)
+            available = table_columns('faculty_collaborations')
             insert_cols = ['faculty_id','title','description','collaboration_type','audience','max_students','max_faculty','required_skills']
             values = [session['user_id'], title, description, collab_type, audience, max_students, max_faculty, required_skills]
             if 'apply_deadline' in available and apply_deadline is not None:
@@ -772,6 +776,7 @@ def create_faculty_collaboration():
             cols_sql = ", ".join(insert_cols)
             ph_sql = ", ".join(["%s"] * len(values))
             cursor.execute(f"INSERT INTO faculty_collaborations ({cols_sql}) VALUES ({ph_sql})", tuple(values))
+            sync_collaboration_skills(cursor, cursor.lastrowid, required_skills_must, required_skills_nice, required_skills)
             db.commit()
             flash("Collaboration posted successfully!", "success")
             return redirect(url_for('collaboration.faculty_dashboard'))
@@ -788,8 +793,7 @@ def edit_faculty_collaboration(collab_id):
     if 'user_id' not in session:
         return redirect(url_for('auth.login'))
     cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
     cursor.execute("SELECT * FROM faculty_collaborations WHERE id = %s", (collab_id,))
     collab = cursor.fetchone()
     if not user or user['role'] != 'faculty' or not collab or collab['faculty_id'] != session['user_id']:
@@ -823,9 +827,7 @@ def edit_faculty_collaboration(collab_id):
         strict_visibility = 1 if strict_raw in ('on', '1', 'true', 'yes') else 0
         required_skills = ", ".join([s for s in [required_skills_must, required_skills_nice] if s.strip()])
         try:
-            cursor.execute("SHOW COLUMNS FROM faculty_collaborations")
-            cols = [c['Field'] if isinstance(c, dict) else c[0] for c in cursor.fetchall()]
-            available = set(cols)
+            available = table_columns('faculty_collaborations')
             set_parts = [
                 "title=%s",
                 "description=%s",
@@ -860,6 +862,7 @@ def edit_faculty_collaboration(collab_id):
             set_sql = ", ".join(set_parts)
             values.extend([collab_id, session['user_id']])
             cursor.execute(f"UPDATE faculty_collaborations SET {set_sql} WHERE id=%s AND faculty_id=%s", tuple(values))
+            sync_collaboration_skills(cursor, collab_id, required_skills_must, required_skills_nice, required_skills)
             db.commit()
             flash("Collaboration updated successfully!", "success")
             cursor.close()
@@ -879,8 +882,7 @@ def faculty_collaboration_details(collab_id):
     cursor = db.cursor(dictionary=True)
     
     # User info
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     # Collab details
     cursor.execute("""
@@ -932,23 +934,6 @@ def faculty_collaboration_details(collab_id):
     """, (collab_id,))
     accepted_users = cursor.fetchall()
 
-    try:
-        cursor.execute("SHOW TABLES LIKE 'collaboration_comments'")
-        exists = cursor.fetchone()
-        if not exists:
-            cursor.execute("""
-                CREATE TABLE collaboration_comments (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    collaboration_id INT NOT NULL,
-                    user_id INT NOT NULL,
-                    content TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            db.commit()
-    except Exception:
-        db.rollback()
-
     cursor.execute("""
         SELECT cc.*, u.name as user_name, u.profile_photo as user_photo
         FROM collaboration_comments cc
@@ -964,111 +949,20 @@ def faculty_collaboration_details(collab_id):
     recommended_faculty = []
     recommended_students = []
     if user['id'] == collab['faculty_id']:
-        req_must = [s.strip().lower() for s in (collab.get('required_skills_must') or collab.get('must_have_skills') or "").split(',') if s.strip()]
-        req_nice = [s.strip().lower() for s in (collab.get('required_skills_nice') or collab.get('nice_to_have_skills') or "").split(',') if s.strip()]
-        req_all = [s.strip().lower() for s in (collab.get('required_skills') or "").split(',') if s.strip()]
-        def _expand_split(terms):
-            out = []
-            for t in terms:
-                parts = [p.strip() for p in re.split(r'[/&]|\band\b', t) if p.strip()]
-                out.extend(parts if parts else [t])
-            return out
-        req_must = _expand_split(req_must)
-        req_nice = _expand_split(req_nice)
-        req_all = _expand_split(req_all)
+        req_must = split_terms(collab.get('required_skills_must') or collab.get('must_have_skills'))
+        req_nice = split_terms(collab.get('required_skills_nice') or collab.get('nice_to_have_skills'))
+        req_all = split_terms(collab.get('required_skills'))
         if (len(req_must) + len(req_nice) + len(req_all)) == 0:
-            text = f"{str(collab.get('title') or '')} {str(collab.get('description') or '')}".lower()
-            terms = []
-            for t in all_known_terms():
-                if t and t in text:
-                    terms.append(t)
-            req_all = terms
+            req_all = find_known_terms(f"{str(collab.get('title') or '')} {str(collab.get('description') or '')}")
         # Build a simple scoring: skills matches + project domain/tech_stack matches
-        kws = req_must + req_nice + req_all
-        params = [user['id']]
-        where_parts = []
-        for k in kws:
-            where_parts.append("LOWER(skills) LIKE %s OR LOWER(interests) LIKE %s")
-            params.extend([f"%{k}%", f"%{k}%"])
-        base = "SELECT id, name, skills, interests, profile_photo FROM users WHERE role='faculty' AND id != %s"
-        if where_parts:
-            base += " AND (" + " OR ".join(where_parts) + ")"
-        base += " LIMIT 12"
+        kws = fuzzy_expand(cursor, skill_tokens(",".join(req_must + req_nice + req_all)))
+        profile = RequirementProfile(must=req_must, nice=req_nice, general=req_all)
         temp_cursor = db.cursor(dictionary=True)
-        temp_cursor.execute(base, tuple(params))
-        candidates = temp_cursor.fetchall()
-        # Score candidates
-        def _calc(u):
-            us = []
-            if u.get('skills'):
-                base = [s.strip().lower() for s in str(u['skills']).split(',') if s.strip()]
-                us.extend(_expand_split(base))
-            if u.get('interests'):
-                base_i = [s.strip().lower() for s in str(u['interests']).split(',') if s.strip()]
-                us.extend(_expand_split(base_i))
-            us_exp = set(expand_skills(us))
-            must_matches = 0
-            for k in req_must:
-                if set(expand_skills([k])) & us_exp:
-                    must_matches += 1
-            nice_matches = 0
-            for k in req_nice:
-                if set(expand_skills([k])) & us_exp:
-                    nice_matches += 1
-            gen_matches = 0
-            for k in req_all:
-                if set(expand_skills([k])) & us_exp:
-                    gen_matches += 1
-            score = must_matches * 2 + nice_matches + gen_matches
-            total = len(req_must) * 2 + len(req_nice) + len(req_all)
-            percent = int(round(100 * score / total)) if total > 0 else 0
-            u['match_percent'] = percent
-            return score
-        candidates.sort(key=_calc, reverse=True)
-        recommended_faculty = candidates[:6]
+        recommended_faculty = rank_candidates(profile, candidate_pool(temp_cursor, 'faculty', user['id'], kws), limit=6)
         temp_cursor.close()
         if collab.get('audience') in ('students_only', 'both'):
-            kws_s = req_must + req_nice + req_all
-            params_s = [user['id']]
-            where_parts_s = []
-            for k in kws_s:
-                where_parts_s.append("LOWER(skills) LIKE %s OR LOWER(interests) LIKE %s")
-                params_s.extend([f"%{k}%", f"%{k}%"])
-            base_s = "SELECT id, name, skills, interests, profile_photo FROM users WHERE role='student' AND id != %s"
-            if where_parts_s:
-                base_s += " AND (" + " OR ".join(where_parts_s) + ")"
-            base_s += " LIMIT 12"
             temp2 = db.cursor(dictionary=True)
-            temp2.execute(base_s, tuple(params_s))
-            cand_s = temp2.fetchall()
-            def _calc_s(u):
-                us = []
-                if u.get('skills'):
-                    base = [s.strip().lower() for s in str(u['skills']).split(',') if s.strip()]
-                    us.extend(_expand_split(base))
-                if u.get('interests'):
-                    base_i = [s.strip().lower() for s in str(u['interests']).split(',') if s.strip()]
-                    us.extend(_expand_split(base_i))
-                us_exp = set(expand_skills(us))
-                must_matches = 0
-                for k in req_must:
-                    if set(expand_skills([k])) & us_exp:
-                        must_matches += 1
-                nice_matches = 0
-                for k in req_nice:
-                    if set(expand_skills([k])) & us_exp:
-                        nice_matches += 1
-                gen_matches = 0
-                for k in req_all:
-                    if set(expand_skills([k])) & us_exp:
-                        gen_matches += 1
-                score = must_matches * 2 + nice_matches + gen_matches
-                total = len(req_must) * 2 + len(req_nice) + len(req_all)
-                percent = int(round(100 * score / total)) if total > 0 else 0
-                u['match_percent'] = percent
-                return score
-            cand_s.sort(key=_calc_s, reverse=True)
-            recommended_students = cand_s[:8]
+            recommended_students = rank_candidates(profile, candidate_pool(temp2, 'student', user['id'], kws), limit=8)
             temp2.close()
 
     # Check eligibility to apply
@@ -1280,31 +1174,27 @@ def respond_collaboration_request(req_id, action):
     cursor = db.cursor(dictionary=True)
     try:
         cursor.execute("""
-            SELECT cr.id, cr.user_id, cr.collaboration_id, cr.status, cr.message, 
-                   fc.max_students, fc.max_faculty
+            SELECT cr.id, cr.user_id, cr.collaboration_id, cr.status, cr.message, u.role
             FROM collaboration_requests cr
-            JOIN faculty_collaborations fc ON cr.collaboration_id = fc.id
+            JOIN users u ON cr.user_id = u.id
             WHERE cr.id = %s
         """, (req_id,))
         req = cursor.fetchone()
         if not req or req['user_id'] != session['user_id'] or req['status'] != 'pending':
             flash("Unauthorized or invalid request.", "danger")
             return redirect(url_for('collaboration.community'))
-        # Capacity checks on accept
+        # Capacity checks on accept (a limit of 0 means no limit here)
         if action == 'accepted':
-            cursor.execute("SELECT role FROM users WHERE id = %s", (req['user_id'],))
-            me = cursor.fetchone()
-            cursor.execute("""
-                SELECT COUNT(*) as count FROM collaboration_requests cr
-                JOIN users u ON cr.user_id = u.id
-                WHERE cr.collaboration_id = %s AND cr.status = 'accepted' AND u.role = %s
-            """, (req['collaboration_id'], me['role']))
-            current_count = cursor.fetchone()['count']
-            limit = req['max_students'] if me['role'] == 'student' else req['max_faculty']
-            if limit and limit > 0 and current_count >= limit:
-                flash(f"Limit reached for {me['role']}s. Cannot accept.", "warning")
+            result = accept_collaboration_request(cursor, req_id, req['collaboration_id'], req['role'], unlimited_when_zero=True)
+            if result != ACCEPTED:
+                db.rollback()
+                if result == FULL:
+                    flash(f"Limit reached for {req['role']}s. Cannot accept.", "warning")
+                else:
+                    flash("Unauthorized or invalid request.", "danger")
                 return redirect(url_for('collaboration.faculty_collaboration_details', collab_id=req['collaboration_id']))
-        cursor.execute("UPDATE collaboration_requests SET status = %s WHERE id = %s", (action, req_id))
+        else:
+            cursor.execute("UPDATE collaboration_requests SET status = %s WHERE id = %s AND status = 'pending'", (action, req_id))
         db.commit()
         flash(f"Request {action}.", "success")
     except Exception as e:
@@ -1326,9 +1216,10 @@ def manage_faculty_request(req_id, action):
     try:
         # Verify ownership
         cursor.execute("""
-            SELECT cr.collaboration_id, fc.faculty_id, fc.max_students, fc.max_faculty
+            SELECT cr.collaboration_id, fc.faculty_id, u.role
             FROM collaboration_requests cr
             JOIN faculty_collaborations fc ON cr.collaboration_id = fc.id
+            JOIN users u ON cr.user_id = u.id
             WHERE cr.id = %s
         """, (req_id,))
         data = cursor.fetchone()
@@ -1336,27 +1227,17 @@ def manage_faculty_request(req_id, action):
         if not data or data['faculty_id'] != session['user_id']:
             flash("Unauthorized.", "danger")
         else:
-            # If accepting, check limits again
             if action == 'accepted':
-                # Get applicant role
-                cursor.execute("SELECT role FROM users WHERE id = (SELECT user_id FROM collaboration_requests WHERE id = %s)", (req_id,))
-                applicant = cursor.fetchone()
-                
-                # Count current accepted
-                cursor.execute("""
-                    SELECT COUNT(*) as count FROM collaboration_requests cr
-                    JOIN users u ON cr.user_id = u.id
-                    WHERE cr.collaboration_id = %s AND cr.status = 'accepted' AND u.role = %s
-                """, (data['collaboration_id'], applicant['role']))
-                current_count = cursor.fetchone()['count']
-
-                limit = data['max_students'] if applicant['role'] == 'student' else data['max_faculty']
-                
-                if current_count >= limit:
-                    flash(f"Limit reached for {applicant['role']}s. Cannot accept.", "warning")
+                result = accept_collaboration_request(cursor, req_id, data['collaboration_id'], data['role'])
+                if result != ACCEPTED:
+                    db.rollback()
+                    if result == FULL:
+                        flash(f"Limit reached for {data['role']}s. Cannot accept.", "warning")
+                    else:
+                        flash("This request has already been handled.", "info")
                     return redirect(url_for('collaboration.faculty_collaboration_details', collab_id=data['collaboration_id']))
-
-            cursor.execute("UPDATE collaboration_requests SET status = %s WHERE id = %s", (action, req_id))
+            else:
+                cursor.execute("UPDATE collaboration_requests SET status = %s WHERE id = %s AND status = 'pending'", (action, req_id))
             db.commit()
             flash(f"Request {action}.", "success")
             
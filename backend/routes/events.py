@@ -1,7 +1,13 @@
 from flask import Blueprint, request, redirect, url_for, flash, session, render_template, Response, current_app
 from backend.db import db
+from backend.utils.current_user import get_current_user
+from backend.utils.event_filters import normalize_target_years, parse_date, like_pattern
+from backend.utils.schema import has_column
+from backend.utils.club_stats import record_event_created
+from backend.utils.sql import in_clause
 import os
 import csv
+import zlib
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import json
@@ -26,48 +32,21 @@ def is_college_email(email: str) -> bool:
 events_bp = Blueprint('events', __name__)
 from backend.routes.club import club_bp
 
+REGISTRATIONS_PER_PAGE = 25
+EXPORT_CHUNK_SIZE = 500
+EXPORT_GROUP_CONCAT_MAX_LEN = 1024 * 1024
+
 # Ensure uploads directory exists
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Ensure questions table exists
-try:
-    c = db.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS event_questions (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            event_id INT NOT NULL,
-            student_email VARCHAR(255),
-            question TEXT NOT NULL,
-            answer TEXT,
-            answered_by INT,
-            status ENUM('open','answered') DEFAULT 'open',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            answered_at DATETIME NULL
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-    ''')
-    db.commit()
-    c.close()
-except Exception:
-    pass
-
 # ================================
 # LIST ALL EVENTS (PUBLIC)
 # ================================
 @events_bp.route('/events')
 def events():
     cursor = db.cursor(dictionary=True)
-    def column_exists(col):
-        cursor.execute("""
-            SELECT COUNT(*) AS total
-            FROM information_schema.COLUMNS 
-            WHERE BINARY TABLE_SCHEMA = BINARY DATABASE() 
-              AND TABLE_NAME = 'events' 
-              AND COLUMN_NAME = %s
-        """, (col,))
-        res = cursor.fetchone()
-        return (res and (res.get('total', 0) if isinstance(res, dict) else (res[0] if res else 0)) > 0)
-    order_clause = "created_at DESC" if column_exists('created_at') else "id DESC"
+    order_clause = "created_at DESC" if has_column('events', 'created_at') else "id DESC"
     cursor.execute(f"SELECT * FROM events ORDER BY {order_clause}")
     events = cursor.fetchall()
     cursor.close()
@@ -84,8 +63,7 @@ def open_registration_form(event_id):
     cursor = db.cursor(dictionary=True)
     cursor.execute("SELECT * FROM events WHERE id = %s", (event_id,))
     event = cursor.fetchone()
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
     cursor.close()
 
     if not event:
@@ -128,8 +106,7 @@ def event_questions(event_id):
         questions = cursor.fetchall()
         user = None
         if 'user_id' in session:
-            cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-            user = cursor.fetchone()
+            user = get_current_user()
     except Exception as e:
         print(f"Error loading event questions: {e}")
         flash("Error loading questions for this event.", "danger")
@@ -213,18 +190,23 @@ def create_hackathon():
 
         cursor = db.cursor()
         try:
-            cursor.execute("""
-                INSERT INTO events
-                (title, event_type, description, event_date, deadline, mode, venue,
-                 created_by, min_team_size, max_team_size, domains, poster_path,
-                 external_registration_link, target_years)
-                VALUES (%s, 'hackathon', %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                title, description, event_date, deadline, mode, venue,
+            insert_cols = [
+                'title', 'event_type', 'description', 'event_date', 'deadline', 'mode', 'venue',
+                'created_by', 'min_team_size', 'max_team_size', 'domains', 'poster_path',
+                'external_registration_link', 'target_years'
+            ]
+            values = [
+                title, 'hackathon', description, parse_date(event_date), parse_date(deadline), mode, venue,
                 session['user_id'], min_team_size, max_team_size, domains, poster_path,
                 external_registration_link, target_years
-            ))
+            ]
+            if has_column('events', 'target_years_norm'):
+                insert_cols.append('target_years_norm'); values.append(normalize_target_years(target_years))
+            cols_sql = ", ".join(insert_cols)
+            ph_sql = ", ".join(["%s"] * len(values))
+            cursor.execute(f"INSERT INTO events ({cols_sql}) VALUES ({ph_sql})", tuple(values))
             db.commit()
+            record_event_created(session['user_id'], 'hackathon', deadline=parse_date(deadline))
             flash("✅ Hackathon created successfully!", "success")
             return redirect(url_for('events.create_event'))
         except Exception as e:
@@ -235,8 +217,7 @@ def create_hackathon():
             cursor.close()
 
     cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
     cursor.close()
 
     return render_template('create_hackathon.html', user=user)
@@ -253,8 +234,7 @@ def edit_question(qid):
     cursor = db.cursor(dictionary=True)
 
     # ensure this student owns the question
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    u = cursor.fetchone()
+    u = get_current_user()
     student_email = u['email'] if u else None
 
     cursor.execute('SELECT * FROM event_questions WHERE id = %s', (qid,))
@@ -301,8 +281,7 @@ def club_questions():
     cursor = db.cursor(dictionary=True)
 
     # Fetch user for sidebar
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     # fetch questions for events created by this club
     cursor.execute('''
@@ -372,41 +351,80 @@ def view_registrations():
     
     try:
         selected_event_id = request.args.get('event_id')
+        selected_branch = request.args.get('branch', '').strip()
+        selected_year = request.args.get('year', '').strip()
+        selected_domain = request.args.get('domain', '').strip()
+        search_query = request.args.get('search', '').strip()
+        try:
+            page = max(1, int(request.args.get('page', 1)))
+        except ValueError:
+            page = 1
+
         event_filter_clause = ""
         params = [session['user_id']]
         if selected_event_id:
             event_filter_clause = " AND r.event_id = %s"
             params.append(selected_event_id)
 
-        # Base query to get all registrations for events created by this club
-        query = f"""
+        # Filters apply in SQL so only one page of rows is ever loaded
+        filter_clause = event_filter_clause
+        filter_params = list(params)
+        if selected_branch:
+            filter_clause += " AND r.team_lead_branch = %s"
+            filter_params.append(selected_branch)
+        if selected_year:
+            filter_clause += " AND r.team_lead_year = %s"
+            filter_params.append(selected_year)
+        if selected_domain:
+            filter_clause += " AND r.domain = %s"
+            filter_params.append(selected_domain)
+        if search_query:
+            filter_clause += " AND CONCAT_WS(' ', r.team_name, r.team_lead_name, r.team_lead_email, r.project_title) LIKE %s"
+            filter_params.append(like_pattern(search_query))
+
+        cursor.execute(f"""
+            SELECT COUNT(*) AS total
+            FROM event_registrations r
+            JOIN events e ON e.id = r.event_id
+            WHERE e.created_by = %s{filter_clause}
+        """, tuple(filter_params))
+        total_registrations = cursor.fetchone()['total']
+        total_pages = max(1, -(-total_registrations // REGISTRATIONS_PER_PAGE))
+        page = min(page, total_pages)
+
+        cursor.execute(f"""
             SELECT 
                 r.*,
-                e.title AS event_title
+                e.title AS event_title,
+                e.event_type
             FROM event_registrations r
             JOIN events e ON e.id = r.event_id
-            WHERE e.created_by = %s{event_filter_clause}
-            ORDER BY r.created_at DESC
-        """
-        
-        cursor.execute(query, tuple(params))
+            WHERE e.created_by = %s{filter_clause}
+            ORDER BY r.created_at DESC, r.id DESC
+            LIMIT %s OFFSET %s
+        """, (*filter_params, REGISTRATIONS_PER_PAGE, (page - 1) * REGISTRATIONS_PER_PAGE))
         registrations = cursor.fetchall()
-        
-        # For each registration, get team members
-        for reg in registrations:
-            cursor.execute("""
+
+        # Team members for the whole page in one query
+        members_by_reg = {reg['id']: [] for reg in registrations}
+        if members_by_reg:
+            placeholders, reg_params = in_clause(members_by_reg)
+            cursor.execute(f"""
                 SELECT 
+                    registration_id,
                     member_name,
                     member_email,
                     branch,
                     year
                 FROM event_team_members 
-                WHERE registration_id = %s
-            """, (reg['id'],))
-            
-            members = cursor.fetchall()
-            reg['team_members'] = members
-            reg['team_size'] = len(members) + 1  # +1 for team lead
+                WHERE registration_id IN ({placeholders})
+                ORDER BY registration_id, id
+            """, reg_params)
+            for m in cursor.fetchall():
+                members_by_reg[m.pop('registration_id')].append(m)
+        for reg in registrations:
+            reg['team_members'] = members_by_reg[reg['id']]
+            reg['team_size'] = len(reg['team_members']) + 1  # +1 for team lead
 
         # Get unique values for filters
         branch_query = f"""
@@ -428,16 +446,12 @@ def view_registrations():
         years = [row['year'] for row in cursor.fetchall()]
 
         domain_query = f"""
-            SELECT DISTINCT domain 
-            FROM event_registrations 
-            WHERE domain IS NOT NULL
+            SELECT DISTINCT r.domain
+            FROM event_registrations r
+            JOIN events e ON e.id = r.event_id
+            WHERE e.created_by = %s AND r.domain IS NOT NULL{event_filter_clause}
         """
-        # domain is not tied to created_by table in current schema; when filtering by event, restrict via registration ids
-        if selected_event_id:
-            domain_query += " AND event_id = %s"
-            cursor.execute(domain_query, (selected_event_id,))
-        else:
-            cursor.execute(domain_query)
+        cursor.execute(domain_query, tuple(params))
         domains = [row['domain'] for row in cursor.fetchall()]
 
         # Events list for selector
@@ -449,14 +463,13 @@ def view_registrations():
         """, (session['user_id'],))
         events_list = cursor.fetchall()
 
-        cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-        user = cursor.fetchone()
+        user = get_current_user()
 
         selected_event_title = None
         if selected_event_id:
-            cursor.execute("SELECT title FROM events WHERE id = %s AND created_by = %s", (selected_event_id, session['user_id']))
-            ev = cursor.fetchone()
-            selected_event_title = ev['title'] if ev else None
+            selected_event_title = next(
+                (ev['title'] for ev in events_list if str(ev['id']) == str(selected_event_id)), None
+            )
 
         return render_template(
             'view_registrations.html',
@@ -464,12 +477,16 @@ def view_registrations():
             branches=sorted(branches),
             years=sorted(years),
             domains=sorted(domains),
-            selected_branch=request.args.get('branch', ''),
-            selected_year=request.args.get('year', ''),
-            selected_domain=request.args.get('domain', ''),
+            selected_branch=selected_branch,
+            selected_year=selected_year,
+            selected_domain=selected_domain,
             selected_event_id=selected_event_id or '',
             selected_event_title=selected_event_title,
+            search_query=search_query,
             events_list=events_list,
+            total_registrations=total_registrations,
+            current_page=page,
+            total_pages=total_pages,
             user=user
         )
 
@@ -490,39 +507,52 @@ def download_registrations():
         flash("Unauthorized access", "danger")
         return redirect(url_for('auth.login'))
 
-    cursor = db.cursor(dictionary=True)
-
     selected_event_id = request.args.get('event_id')
     event_filter_clause = ""
     params = [session['user_id']]
     if selected_event_id:
         event_filter_clause = " AND r.event_id = %s"
         params.append(selected_event_id)
+    use_gzip = str(request.args.get('gzip', '')).lower() in ('1', 'true', 'yes')
+
+    # The export gets its own pooled connection: the response body is read
+    # after the request's connection has been handed back, and rows are
+    # pulled from an unbuffered cursor a chunk at a time. The connection is
+    # returned when the server closes the response, which also happens when
+    # the body is never iterated (HEAD, client gone before the first chunk).
+    conn = db.pool.acquire()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        # Default 1024 bytes silently truncates large member lists
+        cursor.execute("SET SESSION group_concat_max_len = %s", (EXPORT_GROUP_CONCAT_MAX_LEN,))
+        cursor.execute("""
+            SELECT
+                e.title AS event_title,
+                r.team_name,
+                r.team_lead_name,
+                r.team_lead_email,
+                r.team_lead_branch,
+                r.team_lead_year,
+                (COUNT(tm.id) + 1) AS team_size,
+                COALESCE(
+                    GROUP_CONCAT(
+                        CONCAT(tm.member_name, ' (', tm.member_email, ')')
+                        SEPARATOR ', '
+                    ), '') AS team_members
+            FROM event_registrations r
+            JOIN events e ON e.id = r.event_id
+            LEFT JOIN event_team_members tm ON tm.registration_id = r.id
+            WHERE e.created_by = %s""" + event_filter_clause + """
+            GROUP BY r.id
+            ORDER BY r.id DESC
+        """, tuple(params))
+    except Exception as e:
+        db.pool.release(conn, discard=True)
+        print(f"Error exporting registrations: {e}")
+        flash("An error occurred while exporting registrations", "danger")
+        return redirect(url_for('events.view_registrations', event_id=selected_event_id))
 
-    cursor.execute("""
-        SELECT
-            e.title AS event_title,
-            r.team_name,
-            r.team_lead_name,
-            r.team_lead_email,
-            r.team_lead_branch,
-            r.team_lead_year,
-            (COUNT(tm.id) + 1) AS team_size,
-            COALESCE(
-                GROUP_CONCAT(
-                    CONCAT(tm.member_name, ' (', tm.member_email, ')')
-                    SEPARATOR ', '
-                ), '') AS team_members
-        FROM event_registrations r
-        JOIN events e ON e.id = r.event_id
-        LEFT JOIN event_team_members tm ON tm.registration_id = r.id
-        WHERE e.created_by = %s""" + event_filter_clause + """
-        GROUP BY r.id
-        ORDER BY r.id DESC
-    """, tuple(params))
-
-    rows = cursor.fetchall()
-    cursor.close()
+    state = {"finished": False}
 
     def generate():
         writer = csv.writer(Echo())
@@ -530,8 +560,11 @@ def download_registrations():
             "Event", "Team Name", "Team Lead", "Lead Email",
             "Branch", "Year", "Team Size", "Team Members"
         ])
-        for row in rows:
-            yield writer.writerow([
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            yield "".join(writer.writerow([
                 row['event_title'],
                 row['team_name'],
                 row['team_lead_name'],
@@ -540,13 +573,38 @@ def download_registrations():
                 row['team_lead_year'],
                 row['team_size'],
                 row['team_members']
-            ])
+            ]) for row in rows)
+        state["finished"] = True
 
-    return Response(
-        generate(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": "attachment; filename=registrations.csv"}
-    )
+    def release_export_connection():
+        finished = state["finished"]
+        try:
+            cursor.close()
+        except Exception:
+            finished = False
+        # Unread rows (early disconnect, HEAD) leave the connection unusable,
+        # so it is dropped rather than reused
+        db.pool.release(conn, discard=not finished)
+
+    headers = {"X-Accel-Buffering": "no"}
+    if use_gzip:
+        headers["Content-Disposition"] = "attachment; filename=registrations.csv.gz"
+        response = Response(gzip_stream(generate()), mimetype="application/gzip", headers=headers)
+    else:
+        headers["Content-Disposition"] = "attachment; filename=registrations.csv"
+        response = Response(generate(), mimetype="text/csv", headers=headers)
+    response.call_on_close(release_export_connection)
+    return response
+
+
+def gzip_stream(chunks):
+    """Compress an iterable of text chunks into a gzip byte stream."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
 
 
 class Echo:
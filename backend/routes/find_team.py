@@ -1,26 +1,66 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app, jsonify, Response
+import json
+import time
+from datetime import datetime
 import mysql.connector
+from backend.config import APP_CONFIG
 from backend.db import db
+from backend.utils.capacity import accept_join_request, ACCEPTED, FULL
+from backend.utils.chat_bus import chat_bus
+from backend.utils.current_user import get_current_user
+from backend.utils.emails import normalize_email
+from backend.utils.skill_fuzzy import fuzzy_expand
+from backend.utils.skill_index import user_tokens, sync_team_request_skills
+from backend.utils.sql import in_clause
+from backend.utils.cache import TTLCache
 
 find_team_bp = Blueprint('find_team', __name__)
 
-try:
-    c = db.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS team_chat_messages (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            team_request_id INT NOT NULL,
-            user_id INT NOT NULL,
-            message TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (team_request_id) REFERENCES team_requests(id) ON DELETE CASCADE,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-    """)
-    db.commit()
-    c.close()
-except Exception:
-    pass
+# Chat authorization per (user_id, team_request_id): owner/accepted-member
+# flag plus whether the event is over. Polls and reconnects within the TTL
+# skip the DB; handle_join_request drops the entry when a request is decided,
+# and the short TTL bounds staleness across worker processes.
+_chat_access_cache = TTLCache(maxsize=10000, ttl=APP_CONFIG.get("CHAT_AUTH_TTL", 30))
+
+def _chat_access(team_request_id, user_id):
+    """{'allowed', 'is_owner', 'is_over'} for the room, or None if it does not exist."""
+    key = (user_id, team_request_id)
+    access = _chat_access_cache.get(key)
+    if access is not None:
+        return access
+    cursor = db.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT tr.owner_user_id,
+                   CASE
+                     WHEN e.end_time IS NOT NULL THEN (e.end_time < NOW())
+                     WHEN e.deadline IS NOT NULL THEN (e.deadline < CURDATE())
+                     ELSE 0
+                   END AS is_over,
+                   EXISTS (
+                       SELECT 1 FROM join_requests jr
+                       WHERE jr.team_request_id = tr.id AND jr.member_user_id = %s AND jr.status = 'accepted'
+                   ) AS is_member
+            FROM team_requests tr
+            JOIN events e ON tr.event_id = e.id
+            WHERE tr.id = %s
+        """, (user_id, team_request_id))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not row:
+        return None
+    is_owner = row['owner_user_id'] == user_id
+    access = {
+        'allowed': is_owner or bool(row['is_member']),
+        'is_owner': is_owner,
+        'is_over': bool(row['is_over'])
+    }
+    _chat_access_cache.set(key, access)
+    return access
+
+def invalidate_chat_access(user_id, team_request_id):
+    _chat_access_cache.pop((user_id, team_request_id))
 
 # =====================================================
 # FIND TEAM / CREATE TEAM REQUEST
@@ -30,12 +70,11 @@ def find_team():
     if 'user_id' not in session or session.get('role') != 'student':
         return redirect(url_for('auth.login'))
 
-    user_email = session.get('user_email')
+    user_email = normalize_email(session.get('user_email'))
     cursor = db.cursor(dictionary=True)
 
     # Fetch user for sidebar
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     # -------------------------
     # CREATE / UPDATE TEAM REQUEST
@@ -51,23 +90,26 @@ def find_team():
 
         cursor.execute("""
             SELECT id FROM team_requests
-            WHERE email=%s AND event_id=%s
-        """, (user_email, event_id))
+            WHERE owner_user_id=%s AND event_id=%s
+        """, (session['user_id'], event_id))
         existing = cursor.fetchone()
 
         if existing:
             cursor.execute("""
                 UPDATE team_requests
                 SET name=%s, domain=%s, required_skills=%s, branch=%s, year=%s, required_size=%s
-                WHERE email=%s AND event_id=%s
-            """, (name, domain, required_skills, branch, year, required_size, user_email, event_id))
+                WHERE id=%s
+            """, (name, domain, required_skills, branch, year, required_size, existing['id']))
+            team_request_id = existing['id']
         else:
             cursor.execute("""
                 INSERT INTO team_requests
-                (name, email, event_id, domain, required_skills, branch, year, required_size)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-            """, (name, user_email, event_id, domain, required_skills, branch, year, required_size))
+                (name, email, owner_user_id, event_id, domain, required_skills, branch, year, required_size)
+                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+            """, (name, user_email, session['user_id'], event_id, domain, required_skills, branch, year, required_size))
+            team_request_id = cursor.lastrowid
 
+        sync_team_request_skills(cursor, team_request_id, domain, required_skills)
         db.commit()
         cursor.close()
         return redirect(url_for('find_team.find_team'))
@@ -79,11 +121,7 @@ def find_team():
     events = cursor.fetchall()
 
     # Build like-minded filter based on student's skills/interests and profile
-    from backend.utils.skills import expand_skills
-    skills_str = str(user.get('skills') or '')
-    interests_str = str(user.get('interests') or '')
-    initial_terms = [t.strip().lower() for t in (skills_str.split(',') + interests_str.split(',')) if t.strip()]
-    raw_terms = expand_skills(initial_terms)
+    raw_terms = sorted(fuzzy_expand(cursor, user_tokens(user)))
     
     # Year normalization similar to student dashboard
     user_year_raw = (user.get('year') or "").strip().lower()
@@ -106,42 +144,37 @@ def find_team():
                u.profile_photo AS owner_photo
         FROM team_requests tr
         JOIN events e ON tr.event_id = e.id
-        LEFT JOIN users u ON LOWER(u.email) = LOWER(tr.email)
-        WHERE tr.email != %s AND tr.required_size > 0
+        LEFT JOIN users u ON u.id = tr.owner_user_id
+        WHERE NOT (tr.owner_user_id <=> %s) AND tr.required_size > 0
     """
-    params = [user_email]
-
-    like_parts = []
-    for term in raw_terms:
-        like_parts.append("LOWER(tr.domain) LIKE %s")
-        params.append(f"%{term}%")
+    params = [session['user_id']]
 
-    skill_parts = []
-    for term in raw_terms:
-        skill_parts.append("LOWER(tr.required_skills) LIKE %s")
-        params.append(f"%{term}%")
+    # Each filter group carries its own params so placeholders stay in order
+    combined_filters = []
+    if raw_terms:
+        ph, terms = in_clause(raw_terms)
+        combined_filters.append((f"""EXISTS (
+            SELECT 1 FROM team_request_skills trs
+            WHERE trs.team_request_id = tr.id AND trs.source = 'domain' AND trs.skill IN ({ph})
+        )""", terms))
 
-    profile_match = []
     if user_branch and user_year_norm:
-        profile_match.append("(tr.branch = %s AND LOWER(tr.year) = %s)")
-        params.extend([user_branch, user_year_norm])
+        combined_filters.append(("(tr.branch = %s AND LOWER(tr.year) = %s)", [user_branch, user_year_norm]))
     elif user_branch:
-        profile_match.append("(tr.branch = %s)")
-        params.append(user_branch)
+        combined_filters.append(("(tr.branch = %s)", [user_branch]))
     elif user_year_norm:
-        profile_match.append("(LOWER(tr.year) = %s)")
-        params.append(user_year_norm)
+        combined_filters.append(("(LOWER(tr.year) = %s)", [user_year_norm]))
 
-    combined_filters = []
-    if like_parts:
-        combined_filters.append("(" + " OR ".join(like_parts) + ")")
-    if profile_match:
-        combined_filters.append("(" + " OR ".join(profile_match) + ")")
-    if skill_parts:
-        combined_filters.append("(tr.required_skills IS NULL OR tr.required_skills = '' OR (" + " OR ".join(skill_parts) + "))")
+    if raw_terms:
+        combined_filters.append((f"""(tr.required_skills IS NULL OR tr.required_skills = '' OR EXISTS (
+            SELECT 1 FROM team_request_skills trs
+            WHERE trs.team_request_id = tr.id AND trs.source = 'skill' AND trs.skill IN ({ph})
+        ))""", terms))
 
     if combined_filters:
-        base_sql += " AND (" + " OR ".join(combined_filters) + ")"
+        base_sql += " AND (" + " OR ".join(f for f, _ in combined_filters) + ")"
+        for _, filter_params in combined_filters:
+            params.extend(filter_params)
     else:
         # No profile signals; avoid showing all requests
         base_sql += " AND 1=0"
@@ -163,12 +196,11 @@ def join_team(request_id):
     if 'user_id' not in session or session.get('role') != 'student':
         return redirect(url_for('auth.login'))
 
-    user_email = session.get('user_email')
+    user_email = normalize_email(session.get('user_email'))
     cursor = db.cursor(dictionary=True)
 
     # Fetch user for sidebar
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     cursor.execute("""
         SELECT tr.*,
@@ -176,7 +208,7 @@ def join_team(request_id):
                u.id AS owner_id
         FROM team_requests tr
         JOIN events e ON tr.event_id = e.id
-        LEFT JOIN users u ON LOWER(u.email) = LOWER(tr.email)
+        LEFT JOIN users u ON u.id = tr.owner_user_id
         WHERE tr.id=%s
     """, (request_id,))
     team_request = cursor.fetchone()
@@ -186,7 +218,7 @@ def join_team(request_id):
         return redirect(url_for('find_team.find_team'))
 
     # Prevent joining own team
-    if not team_request or team_request['email'] == user_email:
+    if not team_request or team_request['owner_user_id'] == session['user_id']:
         cursor.close()
         return redirect(url_for('find_team.find_team'))
 
@@ -199,8 +231,8 @@ def join_team(request_id):
         # 🚫 PREVENT DUPLICATE JOIN REQUEST
         cursor.execute("""
             SELECT id FROM join_requests
-            WHERE team_request_id=%s AND email=%s
-        """, (request_id, user_email))
+            WHERE team_request_id=%s AND member_user_id=%s
+        """, (request_id, session['user_id']))
 
         if cursor.fetchone():
             flash("You have already requested to join this team.", "info")
@@ -209,9 +241,9 @@ def join_team(request_id):
 
         cursor.execute("""
             INSERT INTO join_requests
-            (team_request_id, name, email, branch, year, phone, status)
-            VALUES (%s,%s,%s,%s,%s,%s,'pending')
-        """, (request_id, name, user_email, branch, year, phone))
+            (team_request_id, name, email, member_user_id, branch, year, phone, status)
+            VALUES (%s,%s,%s,%s,%s,%s,%s,'pending')
+        """, (request_id, name, user_email, session['user_id'], branch, year, phone))
 
         db.commit()
         flash("Join request sent to the team owner.", "success")
@@ -233,8 +265,7 @@ def my_team_requests():
     cursor = db.cursor(dictionary=True)
 
     # Fetch user for sidebar
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     cursor.execute("""
         SELECT 
@@ -251,9 +282,9 @@ def my_team_requests():
         FROM join_requests jr
         JOIN team_requests tr ON jr.team_request_id = tr.id
         JOIN events e ON tr.event_id = e.id
-        WHERE LOWER(tr.email) = LOWER(%s)
+        WHERE tr.owner_user_id = %s
         ORDER BY jr.id DESC
-    """, (session['user_email'],))
+    """, (session['user_id'],))
 
     join_requests = cursor.fetchall()
     cursor.close()
@@ -268,89 +299,116 @@ def my_team_requests():
 def team_chats():
     if 'user_id' not in session or session.get('role') != 'student':
         return redirect(url_for('auth.login'))
-    user_email = session.get('user_email')
     cursor = db.cursor(dictionary=True)
-    # Rooms owned by user
+    # Rooms the user owns or is an accepted member of, with the event-over
+    # flag and the owner's account in the same pass
     cursor.execute("""
-        SELECT tr.id, tr.name, e.title AS event_title
+        SELECT tr.id, tr.name, tr.email, e.title AS event_title,
+               CASE
+                 WHEN e.end_time IS NOT NULL THEN (e.end_time < NOW())
+                 WHEN e.deadline IS NOT NULL THEN (e.deadline < CURDATE())
+                 ELSE 0
+               END AS is_over,
+               u.name AS owner_user_name, u.email AS owner_user_email
         FROM team_requests tr
         JOIN events e ON tr.event_id = e.id
-        WHERE LOWER(tr.email) = LOWER(%s)
+        LEFT JOIN users u ON u.id = tr.owner_user_id
+        WHERE tr.owner_user_id = %s
+           OR tr.id IN (
+                SELECT jr.team_request_id FROM join_requests jr
+                WHERE jr.member_user_id = %s AND jr.status='accepted'
+           )
         ORDER BY tr.id DESC
-    """, (user_email,))
-    owned = cursor.fetchall() or []
-    # Rooms where user is accepted member
-    cursor.execute("""
-        SELECT DISTINCT tr.id, tr.name, e.title AS event_title
-        FROM join_requests jr
-        JOIN team_requests tr ON jr.team_request_id = tr.id
-        JOIN events e ON tr.event_id = e.id
-        WHERE jr.email = %s AND jr.status='accepted'
-        ORDER BY tr.id DESC
-    """, (user_email,))
-    member = cursor.fetchall() or []
-    # Merge by id
+    """, (session['user_id'], session['user_id']))
     rooms_map = {}
-    for r in owned + member:
-        rooms_map[r['id']] = r
+    for r in cursor.fetchall() or []:
+        rooms_map.setdefault(r['id'], r)
+
+    # Accepted members of every room in one query
+    members_by_room = {room_id: [] for room_id in rooms_map}
+    if rooms_map:
+        placeholders, params = in_clause(list(rooms_map))
+        cursor.execute(f"""
+            SELECT jr.team_request_id, COALESCE(u.name, jr.name) AS name, jr.email
+            FROM join_requests jr
+            LEFT JOIN users u ON u.id = jr.member_user_id
+            WHERE jr.team_request_id IN ({placeholders}) AND jr.status='accepted'
+            ORDER BY jr.team_request_id, name ASC
+        """, params)
+        for m in cursor.fetchall():
+            room_id = m.pop('team_request_id')
+            members_by_room[room_id].append(m)
+
     rooms = []
-    # For each room, compute members and is_over flag
     for room_id, room in rooms_map.items():
-        # is_over
-        cursor.execute("""
-            SELECT CASE
-                     WHEN e.end_time IS NOT NULL THEN (e.end_time < NOW())
-                     WHEN e.deadline IS NOT NULL THEN (e.deadline < CURDATE())
-                     ELSE 0
-                   END AS is_over
-            FROM events e
-            JOIN team_requests tr2 ON tr2.event_id = e.id
-            WHERE tr2.id=%s
-        """, (room_id,))
-        over_row = cursor.fetchone() or {}
-        is_over = bool(over_row.get('is_over'))
-        # owner
-        cursor.execute("""
-            SELECT u.name, u.email
-            FROM users u
-            JOIN team_requests tr ON LOWER(u.email)=LOWER(tr.email)
-            WHERE tr.id=%s
-        """, (room_id,))
-        owner_row = cursor.fetchone()
-        owner_name = (owner_row and owner_row.get('name')) or None
-        owner_email = (owner_row and owner_row.get('email')) or None
+        owner_name = room.get('owner_user_name')
+        owner_email = room.get('owner_user_email')
         if not owner_name:
-            cursor.execute("SELECT name, email FROM team_requests WHERE id=%s", (room_id,))
-            tr_fallback = cursor.fetchone()
-            owner_name = tr_fallback and tr_fallback.get('name')
-            owner_email = tr_fallback and tr_fallback.get('email')
-        # accepted members
-        cursor.execute("""
-            SELECT COALESCE(u.name, jr.name) AS name, jr.email
-            FROM join_requests jr
-            LEFT JOIN users u ON LOWER(u.email)=LOWER(jr.email)
-            WHERE jr.team_request_id=%s AND jr.status='accepted'
-            ORDER BY name ASC
-        """, (room_id,))
-        members = cursor.fetchall() or []
+            owner_name = room.get('name')
+            owner_email = room.get('email')
         rooms.append({
             'id': room_id,
             'event_title': room.get('event_title'),
             'team_name': f"{room.get('name')}'s Team" if room.get('name') else 'Team',
             'owner_name': owner_name,
             'owner_email': owner_email,
-            'members': members,
-            'is_over': is_over
+            'members': members_by_room[room_id],
+            'is_over': bool(room.get('is_over'))
         })
     cursor.close()
     # Sort with active first
     rooms.sort(key=lambda r: (r['is_over'], -r['id']))
     return render_template('team_chats.html', rooms=rooms)
 
+CHAT_PAGE_SIZE = 50
+CHAT_MAX_PAGE_SIZE = 200
+
+def _chat_page(cursor, team_request_id, after_id=None, before_id=None, limit=CHAT_PAGE_SIZE):
+    """One page of a room's messages, oldest first.
+
+    With after_id, reads forward from that message; otherwise returns the
+    newest `limit` messages, older than before_id when given. Both walk the
+    (team_request_id, id) index.
+    """
+    select = """
+        SELECT m.id, m.message, m.created_at, u.name AS user_name, u.profile_photo
+        FROM team_chat_messages m
+        JOIN users u ON u.id = m.user_id
+    """
+    if after_id is not None:
+        cursor.execute(select + """
+            WHERE m.team_request_id=%s AND m.id > %s
+            ORDER BY m.id ASC
+            LIMIT %s
+        """, (team_request_id, after_id, limit))
+        return cursor.fetchall()
+    if before_id is not None:
+        cursor.execute(select + """
+            WHERE m.team_request_id=%s AND m.id < %s
+            ORDER BY m.id DESC
+            LIMIT %s
+        """, (team_request_id, before_id, limit))
+    else:
+        cursor.execute(select + """
+            WHERE m.team_request_id=%s
+            ORDER BY m.id DESC
+            LIMIT %s
+        """, (team_request_id, limit))
+    rows = cursor.fetchall()
+    rows.reverse()
+    return rows
+
 @find_team_bp.route('/team-chat/<int:team_request_id>')
 def team_chat(team_request_id):
     if 'user_id' not in session or session.get('role') != 'student':
         return redirect(url_for('auth.login'))
+    access = _chat_access(team_request_id, session['user_id'])
+    if not access or not access['allowed']:
+        return redirect(url_for('find_team.find_team'))
+    if access['is_over']:
+        # Messages of ended events are purged by the maintenance worker
+        flash("This team's chat has ended.", "info")
+        return redirect(url_for('find_team.find_team'))
     cursor = db.cursor(dictionary=True)
     cursor.execute("""
         SELECT tr.*, e.deadline, e.end_time
@@ -362,50 +420,10 @@ def team_chat(team_request_id):
     if not tr:
         cursor.close()
         return redirect(url_for('find_team.find_team'))
-    is_owner = str(tr.get('email') or '').strip().lower() == str(session.get('user_email') or '').strip().lower()
-    if not is_owner:
-        cursor.execute("""
-            SELECT id FROM join_requests
-            WHERE team_request_id=%s AND email=%s AND status='accepted'
-        """, (team_request_id, session.get('user_email')))
-        mem = cursor.fetchone()
-        if not mem:
-            cursor.close()
-            return redirect(url_for('find_team.find_team'))
-    cursor.execute("SELECT NOW()")
-    now_row = cursor.fetchone()
-    cursor.execute("""
-        SELECT CASE
-                 WHEN e.end_time IS NOT NULL THEN (e.end_time < NOW())
-                 WHEN e.deadline IS NOT NULL THEN (e.deadline < CURDATE())
-                 ELSE 0
-               END AS is_over
-        FROM events e
-        JOIN team_requests tr2 ON tr2.event_id = e.id
-        WHERE tr2.id=%s
-    """, (team_request_id,))
-    over_row = cursor.fetchone()
-    if over_row and (over_row.get('is_over') == 1 or over_row.get('is_over') is True):
-        try:
-            cursor2 = db.cursor()
-            cursor2.execute("DELETE FROM team_chat_messages WHERE team_request_id=%s", (team_request_id,))
-            db.commit()
-            cursor2.close()
-        except Exception:
-            db.rollback()
-        cursor.close()
-        flash("This team's chat has ended.", "info")
-        return redirect(url_for('find_team.find_team'))
-    cursor.execute("""
-        SELECT m.id, m.message, m.created_at, u.name AS user_name, u.profile_photo
-        FROM team_chat_messages m
-        JOIN users u ON u.id = m.user_id
-        WHERE m.team_request_id=%s
-        ORDER BY m.created_at ASC, m.id ASC
-    """, (team_request_id,))
-    messages = cursor.fetchall()
+    messages = _chat_page(cursor, team_request_id)
     cursor.close()
-    return render_template('team_chat.html', team_request=tr, messages=messages)
+    return render_template('team_chat.html', team_request=tr, messages=messages,
+                           has_more=len(messages) >= CHAT_PAGE_SIZE, page_size=CHAT_PAGE_SIZE)
 
 @find_team_bp.route('/team-chat/<int:team_request_id>/send', methods=['POST'])
 def team_chat_send(team_request_id):
@@ -414,42 +432,13 @@ def team_chat_send(team_request_id):
     msg = (request.form.get('message') or '').strip()
     if not msg:
         return redirect(url_for('find_team.team_chat', team_request_id=team_request_id))
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("""
-        SELECT tr.*, e.deadline, e.end_time
-        FROM team_requests tr
-        JOIN events e ON tr.event_id = e.id
-        WHERE tr.id=%s
-    """, (team_request_id,))
-    tr = cursor.fetchone()
-    if not tr:
-        cursor.close()
+    access = _chat_access(team_request_id, session['user_id'])
+    if not access or not access['allowed']:
         return redirect(url_for('find_team.find_team'))
-    is_owner = str(tr.get('email') or '').strip().lower() == str(session.get('user_email') or '').strip().lower()
-    if not is_owner:
-        cursor.execute("""
-            SELECT id FROM join_requests
-            WHERE team_request_id=%s AND email=%s AND status='accepted'
-        """, (team_request_id, session.get('user_email')))
-        mem = cursor.fetchone()
-        if not mem:
-            cursor.close()
-            return redirect(url_for('find_team.find_team'))
-    cursor.execute("""
-        SELECT CASE
-                 WHEN e.end_time IS NOT NULL THEN (e.end_time < NOW())
-                 WHEN e.deadline IS NOT NULL THEN (e.deadline < CURDATE())
-                 ELSE 0
-               END AS is_over
-        FROM events e
-        JOIN team_requests tr2 ON tr2.event_id = e.id
-        WHERE tr2.id=%s
-    """, (team_request_id,))
-    over_row = cursor.fetchone()
-    if over_row and (over_row.get('is_over') == 1 or over_row.get('is_over') is True):
-        cursor.close()
+    if access['is_over']:
         flash("This team's chat has ended.", "info")
         return redirect(url_for('find_team.find_team'))
+    sent = None
     try:
         cursor2 = db.cursor()
         cursor2.execute("""
@@ -457,10 +446,20 @@ def team_chat_send(team_request_id):
             VALUES (%s,%s,%s)
         """, (team_request_id, session['user_id'], msg))
         db.commit()
+        user = get_current_user() or {}
+        sent = {
+            'id': cursor2.lastrowid,
+            'message': msg,
+            'created_at': datetime.now().replace(microsecond=0),
+            'user_name': user.get('name')
+        }
         cursor2.close()
     except Exception:
         db.rollback()
-    cursor.close()
+    if sent:
+        chat_bus.publish(team_request_id, sent)
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return jsonify({'ok': bool(sent)}), (200 if sent else 500)
     return redirect(url_for('find_team.team_chat', team_request_id=team_request_id))
 
 @find_team_bp.route('/team-chat/<int:team_request_id>/messages')
@@ -468,32 +467,14 @@ def team_chat_messages(team_request_id):
     try:
         if 'user_id' not in session or session.get('role') != 'student':
             return jsonify([])
-        cursor = db.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT tr.email FROM team_requests tr WHERE tr.id=%s
-        """, (team_request_id,))
-        tr = cursor.fetchone()
-        if not tr:
-            cursor.close()
+        access = _chat_access(team_request_id, session['user_id'])
+        if not access or not access['allowed']:
             return jsonify([])
-        is_owner = str(tr.get('email') or '').strip().lower() == str(session.get('user_email') or '').strip().lower()
-        if not is_owner:
-            cursor.execute("""
-                SELECT id FROM join_requests
-                WHERE team_request_id=%s AND email=%s AND status='accepted'
-            """, (team_request_id, session.get('user_email')))
-            mem = cursor.fetchone()
-            if not mem:
-                cursor.close()
-                return jsonify([])
-        cursor.execute("""
-            SELECT m.id, m.message, m.created_at, u.name AS user_name
-            FROM team_chat_messages m
-            JOIN users u ON u.id = m.user_id
-            WHERE m.team_request_id=%s
-            ORDER BY m.created_at ASC, m.id ASC
-        """, (team_request_id,))
-        messages = cursor.fetchall()
+        cursor = db.cursor(dictionary=True)
+        after_id = request.args.get('after_id', type=int)
+        before_id = request.args.get('before_id', type=int)
+        limit = min(max(request.args.get('limit', CHAT_PAGE_SIZE, type=int), 1), CHAT_MAX_PAGE_SIZE)
+        messages = _chat_page(cursor, team_request_id, after_id=after_id, before_id=before_id, limit=limit)
         cursor.close()
         return jsonify(messages)
     except mysql.connector.Error as err:
@@ -506,6 +487,103 @@ def team_chat_messages(team_request_id):
             return jsonify([])
         raise
 
+def _chat_messages_after(team_request_id, after_id, limit=CHAT_MAX_PAGE_SIZE):
+    # Runs from the stream generator, outside the request context, so the
+    # pooled connection is handed back straight away instead of being pinned
+    # for as long as the browser keeps the stream open.
+    try:
+        cursor = db.cursor(dictionary=True)
+        rows = _chat_page(cursor, team_request_id, after_id=after_id, limit=limit)
+        cursor.close()
+        return rows
+    except mysql.connector.Error as err:
+        print(f"Error loading chat messages: {err}")
+        return []
+    finally:
+        db.release()
+
+def _sse_event(message):
+    data = json.dumps(message, default=str)
+    return f"id: {message['id']}\nevent: message\ndata: {data}\n\n"
+
+@find_team_bp.route('/team-chat/<int:team_request_id>/stream')
+def team_chat_stream(team_request_id):
+    if 'user_id' not in session or session.get('role') != 'student':
+        return Response(status=401)
+    access = _chat_access(team_request_id, session['user_id'])
+    if not access:
+        return Response(status=404)
+    if not access['allowed']:
+        return Response(status=403)
+    cursor = db.cursor(dictionary=True)
+    # Browsers send Last-Event-ID on reconnect; the page passes the last
+    # rendered id on the first connect
+    raw_last = request.headers.get('Last-Event-ID') or request.args.get('last_id')
+    try:
+        last_id = int(raw_last) if raw_last else None
+    except (TypeError, ValueError):
+        last_id = None
+    if last_id is None:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM team_chat_messages WHERE team_request_id=%s", (team_request_id,))
+        last_id = int(cursor.fetchone()['max_id'])
+    cursor.close()
+    db.release()
+
+    user_id = session['user_id']
+    keepalive = APP_CONFIG.get("CHAT_STREAM_KEEPALIVE", 20.0)
+    # Each open stream holds one gunicorn thread, so streams are closed after
+    # CHAT_STREAM_MAX_AGE seconds; EventSource reconnects with Last-Event-ID
+    # and goes through the access check again.
+    max_age = APP_CONFIG.get("CHAT_STREAM_MAX_AGE", 300.0)
+
+    def still_allowed():
+        try:
+            current = _chat_access(team_request_id, user_id)
+        except mysql.connector.Error as err:
+            print(f"Error checking chat access: {err}")
+            return False
+        finally:
+            db.release()
+        return bool(current and current['allowed'] and not current['is_over'])
+
+    def generate(last_id=last_id):
+        # Subscribing here rather than in the view means a body that is never
+        # iterated (HEAD, client gone before the first chunk) leaves nothing
+        # behind. Subscribe before the catch-up read so nothing published in
+        # between is lost.
+        sub = chat_bus.subscribe(team_request_id)
+        try:
+            deadline = time.monotonic() + max_age
+            yield "retry: 3000\n\n"
+            for m in _chat_messages_after(team_request_id, last_id):
+                last_id = m['id']
+                yield _sse_event(m)
+            while time.monotonic() < deadline:
+                m = sub.get(timeout=keepalive)
+                if m is None or sub.lagged:
+                    # Quiet period (or we fell behind): stop if the member was
+                    # removed or the event ended, then pick up anything sent
+                    # through another worker process with one keyset read
+                    sub.lagged = False
+                    if not still_allowed():
+                        return
+                    missed = _chat_messages_after(team_request_id, last_id)
+                    for row in missed:
+                        last_id = row['id']
+                        yield _sse_event(row)
+                    if not missed:
+                        yield ": keepalive\n\n"
+                    continue
+                if m['id'] <= last_id:
+                    continue
+                last_id = m['id']
+                yield _sse_event(m)
+        finally:
+            chat_bus.unsubscribe(team_request_id, sub)
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(generate(), mimetype='text/event-stream', headers=headers)
+
 # =====================================================
 # ACCEPT / REJECT JOIN REQUEST
 # =====================================================
@@ -520,12 +598,12 @@ def handle_join_request(request_id):
     cursor.execute("""
         SELECT 
             jr.status,
-            tr.required_size,
+            jr.member_user_id,
             tr.id AS team_id
         FROM join_requests jr
         JOIN team_requests tr ON jr.team_request_id = tr.id
-        WHERE jr.id=%s AND tr.email=%s
-    """, (request_id, session['user_email']))
+        WHERE jr.id=%s AND tr.owner_user_id=%s
+    """, (request_id, session['user_id']))
 
     row = cursor.fetchone()
 
@@ -534,33 +612,32 @@ def handle_join_request(request_id):
         cursor.close()
         return redirect(url_for('find_team.my_team_requests'))
 
-    if action == 'accept' and row['required_size'] > 0:
-        cursor.execute("""
-            UPDATE join_requests
-            SET status='accepted'
-            WHERE id=%s
-        """, (request_id,))
-
-        cursor.execute("""
-            UPDATE team_requests
-            SET required_size = required_size - 1
-            WHERE id=%s
-        """, (row['team_id'],))
-
-    elif action == 'reject':
-        cursor.execute("""
-            UPDATE join_requests
-            SET status='rejected'
-            WHERE id=%s
-        """, (request_id,))
-
-    db.commit()
-    db.commit()
-
-    # Log resulting status for debugging
-    cursor.execute("SELECT status FROM join_requests WHERE id=%s", (request_id,))
-    after = cursor.fetchone()
-    current_app.logger.info("join_request %s status after update: %s", request_id, after.get('status') if after else 'MISSING')
+    try:
+        if action == 'accept':
+            result = accept_join_request(cursor, request_id, row['team_id'])
+            if result == ACCEPTED:
+                db.commit()
+            else:
+                db.rollback()
+                if result == FULL:
+                    flash("Your team is already full.", "warning")
+        elif action == 'reject':
+            cursor.execute("""
+                UPDATE join_requests
+                SET status='rejected'
+                WHERE id=%s AND status='pending'
+            """, (request_id,))
+            db.commit()
+            result = 'rejected'
+        else:
+            result = None
+        if result is not None:
+            invalidate_chat_access(row['member_user_id'], row['team_id'])
+        current_app.logger.info("join_request %s %s -> %s", request_id, action, result)
+    except Exception as e:
+        db.rollback()
+        print(f"Error handling join request: {e}")
+        flash("Could not update the join request.", "danger")
 
     cursor.close()
     return redirect(url_for('find_team.my_team_requests'))
@@ -577,8 +654,7 @@ def my_join_requests():
     cursor = db.cursor(dictionary=True)
 
     # Fetch user for sidebar
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
 
     cursor.execute("""
         SELECT 
@@ -593,9 +669,9 @@ def my_join_requests():
         FROM join_requests jr
         JOIN team_requests tr ON jr.team_request_id = tr.id
         JOIN events e ON tr.event_id = e.id
-        WHERE jr.email = %s
+        WHERE jr.member_user_id = %s
         ORDER BY jr.id DESC
-    """, (session['user_email'],))
+    """, (session['user_id'],))
 
     join_requests = cursor.fetchall()
     cursor.close()
@@ -0,0 +1,35 @@
+from flask import Blueprint, request, session, jsonify
+from backend.db import db
+from backend.utils.search import SEARCH_SOURCES, SEARCH_PER_PAGE, search
+
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('/api/search')
+def search_api():
+    if 'user_id' not in session:
+        return jsonify({'error': 'login required'}), 401
+
+    text = request.args.get('q', '').strip()
+    kinds = [k for k in request.args.get('type', '').split(',') if k in SEARCH_SOURCES] or list(SEARCH_SOURCES)
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+        per_page = int(request.args.get('per_page', SEARCH_PER_PAGE))
+    except ValueError:
+        page, per_page = 1, SEARCH_PER_PAGE
+
+    if not text:
+        return jsonify({'query': text, 'results': {}})
+
+    cursor = db.cursor(dictionary=True)
+    try:
+        results = {
+            kind: search(cursor, kind, text, page=page, per_page=per_page, viewer_role=session.get('role'))
+            for kind in kinds
+        }
+    except Exception as e:
+        print(f"Error running search: {e}")
+        return jsonify({'error': 'search failed'}), 500
+    finally:
+        cursor.close()
+
+    return jsonify({'query': text, 'results': results})
@@ -1,15 +1,21 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from backend.db import db
+from backend.utils.current_user import get_current_user, invalidate_user
 import os
 from werkzeug.utils import secure_filename
-from datetime import datetime, date
-from backend.utils.skills import expand_skills
+from datetime import datetime
+from backend.utils.skill_fuzzy import fuzzy_expand
+from backend.utils.skill_index import skill_tokens, sync_user_skills
+from backend.utils.sql import in_clause, batched
+from backend.utils.event_filters import student_event_filters, EVENT_SEARCH_COLUMNS
+from backend.utils.schema import table_columns, has_fulltext
 
 student_bp = Blueprint('student', __name__)
 
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'uploads', 'profile_pics')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+EVENTS_PER_PAGE = 24
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -42,150 +48,55 @@ def dashboard():
             to_date = None
 
     try:
-        cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-        user = cursor.fetchone()
+        user = get_current_user()
         
-        def column_exists(col):
-            cursor.execute("""
-                SELECT COUNT(*) AS total
-                FROM information_schema.COLUMNS 
-                WHERE BINARY TABLE_SCHEMA = BINARY DATABASE() 
-                  AND TABLE_NAME = 'events' 
-                  AND COLUMN_NAME = %s
-            """, (col,))
-            res = cursor.fetchone()
-            return (res and (res.get('total', 0) if isinstance(res, dict) else (res[0] if res else 0)) > 0)
-
-        order_clause = "created_at DESC" if column_exists('created_at') else "id DESC"
-        cursor.execute(f"SELECT * FROM events ORDER BY {order_clause}")
-        all_events = cursor.fetchall()
-
-        events = []
-        today = date.today()
-
-        user_year_raw = (user.get('year') or "").strip().lower()
-        def _norm_year(y):
-            y = y.replace("year", "").strip()
-            mapping = {
-                "1": "1st", "i": "1st", "first": "1st", "1st": "1st",
-                "2": "2nd", "ii": "2nd", "second": "2nd", "2nd": "2nd",
-                "3": "3rd", "iii": "3rd", "third": "3rd", "3rd": "3rd",
-                "4": "4th", "iv": "4th", "fourth": "4th", "4th": "4th"
-            }
-            return mapping.get(y, y)
-        user_year_norm = _norm_year(user_year_raw)
-
-        for ev in all_events:
-            dl = ev.get('registration_deadline') or ev.get('deadline')
-            include = True
-
-            if dl is None:
-                include = True
-            else:
-                # dl may be a date/datetime or a string
-                if isinstance(dl, datetime):
-                    dl_date = dl.date()
-                elif isinstance(dl, date):
-                    dl_date = dl
-                else:
-                    # try parsing common string formats
-                    dl_date = None
-                    for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d-%m-%Y", "%d/%m/%Y"):
-                        try:
-                            parsed = datetime.strptime(str(dl), fmt)
-                            dl_date = parsed.date()
-                            break
-                        except Exception:
-                            continue
-                
-                if dl_date is not None and dl_date < today:
-                    include = False
-
-            if include:
-                et = ev.get('end_time')
-                if et is not None:
-                    if isinstance(et, datetime):
-                        et_dt = et
-                    elif isinstance(et, date):
-                        et_dt = datetime.combine(et, datetime.min.time())
-                    else:
-                        et_dt = None
-                        for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d-%m-%Y %H:%M:%S", "%d-%m-%Y"):
-                            try:
-                                et_dt = datetime.strptime(str(et), fmt)
-                                break
-                            except Exception:
-                                continue
-                    if et_dt and et_dt.date() < today:
-                        include = False
-
-            if include:
-                target_years_str = (ev.get('target_years') or "").strip()
-                ev_type_norm = (ev.get('event_type') or "").strip().lower()
-                if target_years_str and user_year_norm and ev_type_norm != 'hackathon':
-                    allowed_years = [_norm_year(y.strip().lower()) for y in target_years_str.split(",") if y.strip()]
-                    if allowed_years and user_year_norm not in allowed_years:
-                        include = False
-
-            if include:
-                events.append(ev)
-
-        filtered_events = []
-        for ev in events:
-            if type_filter:
-                ev_type = (ev.get('event_type') or "").strip()
-                if ev_type.lower() != type_filter.lower():
-                    continue
-
-            if mode_filter:
-                ev_mode = (ev.get('mode') or "").strip()
-                if ev_mode.lower() != mode_filter.lower():
-                    continue
-
-            if domain_filter:
-                ev_domains = (ev.get('domains') or "")
-                if domain_filter.lower() not in ev_domains.lower():
-                    continue
-
-            ev_date_raw = ev.get('event_date')
-            ev_date_value = None
-            if ev_date_raw is not None:
-                if isinstance(ev_date_raw, datetime):
-                    ev_date_value = ev_date_raw.date()
-                elif isinstance(ev_date_raw, date):
-                    ev_date_value = ev_date_raw
-                else:
-                    for fmt in ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d-%m-%Y", "%d/%m/%Y"):
-                        try:
-                            parsed = datetime.strptime(str(ev_date_raw), fmt)
-                            ev_date_value = parsed.date()
-                            break
-                        except Exception:
-                            continue
-
-            if from_date and ev_date_value and ev_date_value < from_date:
-                continue
-            if to_date and ev_date_value and ev_date_value > to_date:
-                continue
-
-            if search_query:
-                haystack_parts = [
-                    ev.get('title') or "",
-                    ev.get('organizer') or ev.get('club_name') or "",
-                    ev.get('description') or "",
-                    ev.get('domains') or ""
-                ]
-                haystack = " ".join(str(p) for p in haystack_parts).lower()
-                if search_query.lower() not in haystack:
-                    continue
-
-            filtered_events.append(ev)
-
-        events = filtered_events
-
-        for event in events:
-            cursor.execute("""
+        try:
+            page = max(1, int(request.args.get('page', 1)))
+        except ValueError:
+            page = 1
+
+        columns = table_columns('events')
+        where_sql, where_params = student_event_filters(
+            columns,
+            user_year=user.get('year'),
+            event_type=type_filter,
+            mode=mode_filter,
+            domain=domain_filter,
+            from_date=from_date,
+            to_date=to_date,
+            search=search_query,
+            fulltext=has_fulltext('events', EVENT_SEARCH_COLUMNS)
+        )
+
+        cursor.execute(f"SELECT COUNT(*) AS total FROM events {where_sql}", tuple(where_params))
+        total_events = cursor.fetchone()['total'] or 0
+        total_pages = max(1, -(-total_events // EVENTS_PER_PAGE))
+        page = min(page, total_pages)
+
+        cursor.execute(f"""
+            SELECT COUNT(DISTINCT r.event_id) AS total
+            FROM event_registrations r
+            JOIN event_team_members tm ON r.id = tm.registration_id
+            WHERE tm.member_email = %s
+              AND r.event_id IN (SELECT id FROM events {where_sql})
+        """, (user['email'], *where_params))
+        registered_count = cursor.fetchone()['total'] or 0
+
+        order_clause = "created_at DESC, id DESC" if 'created_at' in columns else "id DESC"
+        cursor.execute(
+            f"SELECT * FROM events {where_sql} ORDER BY {order_clause} LIMIT %s OFFSET %s",
+            (*where_params, EVENTS_PER_PAGE, (page - 1) * EVENTS_PER_PAGE)
+        )
+        events = cursor.fetchall()
+
+        # Teams and questions for all listed events in a fixed number of queries
+        teams_by_event = {}
+        questions_by_event = {}
+        for chunk in batched([ev['id'] for ev in events]):
+            ph, ids = in_clause(chunk)
+            cursor.execute(f"""
                 SELECT 
+                    r.event_id,
                     r.id AS registration_id,
                     r.team_name,
                     r.project_title,
@@ -194,23 +105,30 @@ def dashboard():
                 JOIN event_team_members tm
                     ON r.id = tm.registration_id
                 WHERE tm.member_email = %s
-                  AND r.event_id = %s
-            """, (user['email'], event['id']))
-            event['team'] = cursor.fetchone()
-
-            # Attach questions
-            cursor.execute("""
-                SELECT id, question, answer, status, created_at, answered_at
+                  AND r.event_id IN ({ph})
+                ORDER BY r.id ASC
+            """, (user['email'], *ids))
+            for row in cursor.fetchall():
+                event_id = row.pop('event_id')
+                teams_by_event.setdefault(event_id, row)
+
+            cursor.execute(f"""
+                SELECT id, event_id, question, answer, status, created_at, answered_at
                 FROM event_questions
-                WHERE event_id = %s AND (student_email COLLATE utf8mb4_unicode_ci) = %s
+                WHERE event_id IN ({ph}) AND student_email = %s
                 ORDER BY created_at DESC
-            """, (event['id'], user['email']))
-            event['questions'] = cursor.fetchall()
+            """, (*ids, user['email']))
+            for row in cursor.fetchall():
+                questions_by_event.setdefault(row.pop('event_id'), []).append(row)
+
+        for event in events:
+            event['team'] = teams_by_event.get(event['id'])
+            event['questions'] = questions_by_event.get(event['id'], [])
 
         # ✅ Fetch faculty collaborations visible to students (status=open, audience=students_only/both)
         student_skills = []
         if user and user.get('skills'):
-            student_skills = expand_skills(str(user['skills']).split(','))
+            student_skills = sorted(fuzzy_expand(cursor, skill_tokens(user['skills'])))
 
         base_sql = """
             SELECT fc.id, fc.title, fc.description, fc.collaboration_type, fc.audience, fc.required_skills, fc.created_at
@@ -220,11 +138,8 @@ def dashboard():
         """
         params = []
         if student_skills:
-            like_parts = []
-            for s in student_skills:
-                like_parts.append("fc.required_skills LIKE %s")
-                params.append(f"%{s}%")
-            base_sql += " AND (" + " OR ".join(like_parts) + ")"
+            ph, params = in_clause(student_skills)
+            base_sql += f" AND fc.id IN (SELECT collaboration_id FROM collaboration_skills WHERE skill IN ({ph}))"
         else:
             # If the student has no skills filled, only show collaborations without required skills
             base_sql += " AND (fc.required_skills IS NULL OR fc.required_skills = '')"
@@ -237,6 +152,8 @@ def dashboard():
         events = []
         user = {}
         collaborations = []
+        total_events = registered_count = 0
+        page = total_pages = 1
     finally:
         cursor.close()
 
@@ -250,7 +167,11 @@ def dashboard():
         domain_filter=domain_filter,
         mode_filter=mode_filter,
         from_date_str=from_date_str,
-        to_date_str=to_date_str
+        to_date_str=to_date_str,
+        total_events=total_events,
+        registered_count=registered_count,
+        current_page=page,
+        total_pages=total_pages
     )
 
 @student_bp.route('/student/profile', methods=['GET', 'POST'])
@@ -299,7 +220,9 @@ def profile():
             params.append(session['user_id'])
 
             cursor.execute(query, tuple(params))
+            sync_user_skills(cursor, session['user_id'], skills, interests)
             db.commit()
+            invalidate_user(session['user_id'])
             flash("Profile updated successfully!", "success")
         except Exception as e:
             db.rollback()
@@ -309,8 +232,7 @@ def profile():
         return redirect(url_for('student.profile'))
 
     # GET
-    cursor.execute("SELECT * FROM users WHERE id = %s", (session['user_id'],))
-    user = cursor.fetchone()
+    user = get_current_user()
     cursor.close()
 
     return render_template('student_profile.html', user=user)
@@ -1,18 +1,19 @@
 #!/usr/bin/env python3
 """
-Run to accept a join request and decrement the team's required_size if available.
+Run to accept a pending join request and decrement the team's required_size if a slot is free.
 Usage:
-  python scripts/accept_join_request.py 3
-  python scripts/accept_join_request.py 3 --no-decrement
+  python backend/scripts/accept_join_request.py 3
+  python backend/scripts/accept_join_request.py 3 --no-decrement
 """
 import argparse
 import sys
 import os
-# ensure project root is on sys.path so `from db import db` works when running the script
-ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# ensure the repository root is on sys.path so the `backend` package imports
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
-from db import db
+from backend.db import db
+from backend.utils.capacity import accept_join_request, ACCEPTED, FULL, NOT_PENDING
 
 parser = argparse.ArgumentParser(description="Accept a join_request by id")
 parser.add_argument('id', type=int, help='join_request id')
@@ -29,12 +30,18 @@ if not row:
 
 print('Before:', row)
 try:
-    cur.execute("UPDATE join_requests SET status='accepted' WHERE id=%s", (args.id,))
-    if not args.no_decrement and row.get('team_request_id'):
-        cur.execute(
-            "UPDATE team_requests SET required_size = required_size - 1 WHERE id=%s AND required_size > 0",
-            (row['team_request_id'],)
-        )
+    # Same guarded accept as the app, so a request is never counted twice
+    # and a full team is never overfilled
+    if args.no_decrement:
+        cur.execute("UPDATE join_requests SET status='accepted' WHERE id=%s AND status='pending'", (args.id,))
+        outcome = ACCEPTED if cur.rowcount == 1 else NOT_PENDING
+    else:
+        outcome = accept_join_request(cur, args.id, row['team_request_id'])
+    if outcome != ACCEPTED:
+        db.rollback()
+        print('Team is full' if outcome == FULL else 'Request is not pending')
+        cur.close()
+        sys.exit(1)
     db.commit()
 except Exception as e:
     print('Error during update:', e)
@@ -0,0 +1,94 @@
+"""The student dashboard must not issue queries per listed event.
+
+The route runs against a counting fake cursor; only the number of execute()
+calls is checked, so no database is needed.
+"""
+import re
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("mysql.connector")
+
+from flask import Flask
+from backend.routes import student
+
+EVENT_COLUMNS = {'id', 'title', 'event_type', 'mode', 'domains', 'description', 'organizer',
+                 'event_date', 'deadline', 'end_time', 'created_at', 'target_years_norm'}
+
+class CountingCursor:
+    def __init__(self, total_events):
+        self.total_events = total_events
+        self.statements = []
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.statements.append(sql)
+        params = tuple(params or ())
+        if re.search(r"SELECT\s+COUNT", sql):
+            self._rows = [{'total': self.total_events}]
+        elif re.search(r"SELECT \* FROM events", sql):
+            limit, offset = params[-2], params[-1]
+            ids = range(offset + 1, min(offset + limit, self.total_events) + 1)
+            self._rows = [{'id': i, 'title': f"Event {i}"} for i in ids]
+        else:
+            self._rows = []
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+class FakeDB:
+    def __init__(self, total_events):
+        self.cursor_obj = CountingCursor(total_events)
+
+    def cursor(self, dictionary=False):
+        return self.cursor_obj
+
+@pytest.fixture
+def dashboard(monkeypatch):
+    monkeypatch.setattr(student, 'get_current_user', lambda: {
+        'id': 1, 'email': 'student@anurag.edu.in', 'year': '2nd', 'skills': 'python'
+    })
+    monkeypatch.setattr(student, 'table_columns', lambda table: EVENT_COLUMNS)
+    monkeypatch.setattr(student, 'has_fulltext', lambda table, columns: False)
+    monkeypatch.setattr(student, 'fuzzy_expand', lambda cursor, tokens: set(tokens))
+    rendered = {}
+    monkeypatch.setattr(student, 'render_template', lambda name, **ctx: rendered.update(ctx) or "")
+
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.register_blueprint(student.student_bp)
+
+    def run(total_events):
+        fake = FakeDB(total_events)
+        monkeypatch.setattr(student, 'db', fake)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = 1
+            sess['role'] = 'student'
+        assert client.get('/student-dashboard').status_code == 200
+        return len(fake.cursor_obj.statements), rendered['events']
+    return run
+
+def test_query_count_is_constant_in_the_number_of_events(dashboard):
+    one, events_one = dashboard(1)
+    many, events_many = dashboard(200)
+    assert len(events_one) == 1
+    assert len(events_many) == student.EVENTS_PER_PAGE
+    assert one == many
+
+def test_team_and_question_lookups_are_two_queries_per_500_listed_events(dashboard, monkeypatch):
+    # Lift the page size so the id batching itself is exercised: each chunk
+    # of up to 500 listed events costs one team and one question query
+    monkeypatch.setattr(student, 'EVENTS_PER_PAGE', 2000)
+    one, _ = dashboard(1)
+    assert dashboard(200)[0] == one
+    assert dashboard(500)[0] == one
+    assert dashboard(501)[0] == one + 2
+    assert dashboard(1000)[0] == one + 2
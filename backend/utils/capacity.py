@@ -0,0 +1,123 @@
+from backend.utils.schema import has_column
+
+# Seat accounting for accepts. Every accept is a guarded status change
+# (``... AND status = 'pending'``) plus a conditional seat update in the same
+# transaction, so two owners clicking "accept" at once can neither accept the
+# same request twice nor push a team/collaboration past its limit. Callers
+# pass a dictionary cursor, commit on ACCEPTED and roll back otherwise.
+ACCEPTED = 'accepted'
+FULL = 'full'
+NOT_PENDING = 'not_pending'
+
+_SEAT_COLUMNS = {
+    'student': ('accepted_students', 'max_students'),
+    'faculty': ('accepted_faculty', 'max_faculty'),
+}
+
+def accept_join_request(cursor, request_id, team_request_id):
+    """Accept a pending join request, taking one of the team's open slots."""
+    cursor.execute(
+        "UPDATE join_requests SET status = 'accepted' WHERE id = %s AND status = 'pending'",
+        (request_id,)
+    )
+    if cursor.rowcount != 1:
+        return NOT_PENDING
+    cursor.execute(
+        "UPDATE team_requests SET required_size = required_size - 1 WHERE id = %s AND required_size > 0",
+        (team_request_id,)
+    )
+    return ACCEPTED if cursor.rowcount == 1 else FULL
+
+def _reserve_by_count(cursor, collaboration_id, role, unlimited_when_zero):
+    # Schemas without the counter columns: serialize accepts on the
+    # collaboration row, then count.
+    _, limit_col = _SEAT_COLUMNS[role]
+    cursor.execute(f"SELECT {limit_col} AS seat_limit FROM faculty_collaborations WHERE id = %s FOR UPDATE", (collaboration_id,))
+    row = cursor.fetchone()
+    if not row:
+        return False
+    limit = row['seat_limit'] or 0
+    if unlimited_when_zero and limit <= 0:
+        return True
+    cursor.execute("""
+        SELECT COUNT(*) AS count FROM collaboration_requests cr
+        JOIN users u ON cr.user_id = u.id
+        WHERE cr.collaboration_id = %s AND cr.status = 'accepted' AND u.role = %s
+        LOCK IN SHARE MODE
+    """, (collaboration_id, role))
+    # Locking read, so accepts committed after this transaction's snapshot are
+    # counted; the request being accepted was already flipped above.
+    return cursor.fetchone()['count'] <= limit
+
+def accept_collaboration_request(cursor, request_id, collaboration_id, role, unlimited_when_zero=False):
+    """Accept a pending collaboration request if the applicant's role still has a seat.
+
+    A limit of 0 means "no seats" unless ``unlimited_when_zero`` is set.
+    """
+    cursor.execute(
+        "UPDATE collaboration_requests SET status = 'accepted' WHERE id = %s AND status = 'pending'",
+        (request_id,)
+    )
+    if cursor.rowcount != 1:
+        return NOT_PENDING
+    if role not in _SEAT_COLUMNS:
+        return ACCEPTED
+
+    count_col, limit_col = _SEAT_COLUMNS[role]
+    if not has_column('faculty_collaborations', count_col):
+        return ACCEPTED if _reserve_by_count(cursor, collaboration_id, role, unlimited_when_zero) else FULL
+
+    condition = f"{count_col} < {limit_col}"
+    if unlimited_when_zero:
+        condition = f"({limit_col} <= 0 OR {condition})"
+    cursor.execute(
+        f"UPDATE faculty_collaborations SET {count_col} = {count_col} + 1 WHERE id = %s AND {condition}",
+        (collaboration_id,)
+    )
+    return ACCEPTED if cursor.rowcount == 1 else FULL
+
+def seat_drift(cursor, after_id=0, limit=200):
+    """Ids of collaborations whose accepted_* counters disagree with the
+    accepted requests (after deleted users, role changes or manual edits).
+    Non-locking read on a tuple cursor; fix each one with reconcile_seats."""
+    cursor.execute("""
+        SELECT fc.id
+        FROM faculty_collaborations fc
+        LEFT JOIN (
+            SELECT cr.collaboration_id,
+                   SUM(u.role = 'student') AS students,
+                   SUM(u.role = 'faculty') AS faculty
+            FROM collaboration_requests cr
+            JOIN users u ON cr.user_id = u.id
+            WHERE cr.status = 'accepted'
+            GROUP BY cr.collaboration_id
+        ) c ON c.collaboration_id = fc.id
+        WHERE fc.id > %s
+          AND (fc.accepted_students != COALESCE(c.students, 0)
+               OR fc.accepted_faculty != COALESCE(c.faculty, 0))
+        ORDER BY fc.id
+        LIMIT %s
+    """, (after_id, limit))
+    return [row[0] for row in cursor.fetchall()]
+
+def reconcile_seats(cursor, collaboration_id):
+    """Recount one collaboration's accepted seats; caller commits.
+
+    Locks the collaboration row first, the same row every accept updates, so
+    the recount cannot interleave with a concurrent accept.
+    """
+    cursor.execute("SELECT id FROM faculty_collaborations WHERE id = %s FOR UPDATE", (collaboration_id,))
+    if not cursor.fetchall():
+        return
+    cursor.execute("""
+        UPDATE faculty_collaborations fc
+        SET fc.accepted_students = (
+                SELECT COUNT(*) FROM collaboration_requests cr JOIN users u ON cr.user_id = u.id
+                WHERE cr.collaboration_id = fc.id AND cr.status = 'accepted' AND u.role = 'student'
+            ),
+            fc.accepted_faculty = (
+                SELECT COUNT(*) FROM collaboration_requests cr JOIN users u ON cr.user_id = u.id
+                WHERE cr.collaboration_id = fc.id AND cr.status = 'accepted' AND u.role = 'faculty'
+            )
+        WHERE fc.id = %s
+    """, (collaboration_id,))
@@ -0,0 +1,57 @@
+import queue
+import threading
+
+class Subscription:
+    """One open chat stream. Messages beyond ``maxsize`` set ``lagged`` so the
+    reader knows to resync from the database instead of blocking publishers."""
+
+    def __init__(self, maxsize=256):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.lagged = False
+
+    def put(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.lagged = True
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class ChatBus:
+    """In-process fan-out of new team chat messages, keyed by team_request_id."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rooms = {}
+
+    def subscribe(self, room_id):
+        sub = Subscription()
+        with self._lock:
+            self._rooms.setdefault(room_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, room_id, sub):
+        with self._lock:
+            subs = self._rooms.get(room_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._rooms[room_id]
+
+    def publish(self, room_id, message):
+        with self._lock:
+            subs = list(self._rooms.get(room_id, ()))
+        for sub in subs:
+            sub.put(message)
+
+    def subscriber_count(self, room_id=None):
+        with self._lock:
+            if room_id is not None:
+                return len(self._rooms.get(room_id, ()))
+            return sum(len(s) for s in self._rooms.values())
+
+chat_bus = ChatBus()
@@ -0,0 +1,91 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, time
+from backend.config import APP_CONFIG
+from backend.utils.cache import TTLCache
+
+# Columns the aggregate relies on; older schemas fall back to live COUNT queries
+STATS_COLUMNS = ('created_by', 'event_type', 'deadline', 'start_time', 'end_time')
+
+def active_until(deadline, start_time, end_time):
+    """Last moment an event counts as active on the club dashboard, or None.
+
+    Mirrors the SQL condition used for the live counts:
+    (end_time >= NOW()) OR (start_time IS NULL AND (deadline IS NULL OR deadline >= CURDATE())).
+    """
+    candidates = []
+    if end_time is not None:
+        candidates.append(end_time)
+    if start_time is None:
+        if deadline is None:
+            candidates.append(datetime.max)
+        else:
+            if isinstance(deadline, datetime):
+                deadline = deadline.date()
+            candidates.append(datetime.combine(deadline, time.max))
+    return max(candidates) if candidates else None
+
+class ClubStats:
+    """Dashboard numbers for one club.
+
+    Totals are plain counters; for "active" each event type keeps a sorted
+    list of the moments its events stop being active, so the count for any
+    point in time is a bisect rather than a table scan.
+    """
+
+    def __init__(self):
+        self.totals = Counter()
+        self.registrations = 0
+        self._active_until = {}
+
+    def add_event(self, event_type, deadline=None, start_time=None, end_time=None, registrations=0):
+        key = (event_type or '').lower()
+        self.totals[key] += 1
+        self.registrations += int(registrations or 0)
+        until = active_until(deadline, start_time, end_time)
+        if until is not None:
+            insort(self._active_until.setdefault(key, []), until)
+
+    def event_stats(self, event_type, now=None):
+        key = (event_type or '').lower()
+        now = now or datetime.now()
+        untils = self._active_until.get(key, [])
+        return {'total': self.totals.get(key, 0), 'active': len(untils) - bisect_left(untils, now)}
+
+# Entries expire after CLUB_STATS_TTL seconds and are rebuilt from the
+# tables, which reconciles anything the incremental hooks did not see
+# (writes in other worker processes, registrations imported externally).
+_club_stats = TTLCache(maxsize=1024, ttl=APP_CONFIG.get("CLUB_STATS_TTL", 300))
+
+def load_club_stats(cursor, club_id):
+    """Rebuild a club's aggregate with one query; cursor must be a dictionary cursor."""
+    cursor.execute("""
+        SELECT e.event_type, e.deadline, e.start_time, e.end_time,
+               (SELECT COUNT(*) FROM event_registrations er WHERE er.event_id = e.id) AS registrations
+        FROM events e
+        WHERE e.created_by = %s
+    """, (club_id,))
+    stats = ClubStats()
+    for row in cursor.fetchall():
+        stats.add_event(row['event_type'], row['deadline'], row['start_time'], row['end_time'], row['registrations'])
+    _club_stats.set(club_id, stats)
+    return stats
+
+def get_club_stats(cursor, club_id):
+    stats = _club_stats.get(club_id)
+    if stats is None:
+        stats = load_club_stats(cursor, club_id)
+    return stats
+
+def record_event_created(club_id, event_type, deadline=None, start_time=None, end_time=None):
+    """Apply a newly committed event to the cached aggregate, if any."""
+    stats = _club_stats.get(club_id)
+    if stats is not None:
+        stats.add_event(event_type, deadline, start_time, end_time)
+
+def invalidate_club_stats(club_id=None):
+    """Drop a club's aggregate (or all of them) so the next read rebuilds it."""
+    if club_id is None:
+        _club_stats.clear()
+    else:
+        _club_stats.pop(club_id)
@@ -0,0 +1,49 @@
+from flask import g, session, has_request_context
+from backend.db import db
+from backend.config import APP_CONFIG
+from backend.utils.cache import TTLCache
+
+# Process-wide cache of user rows keyed by id. Profile updates invalidate their
+# own entry; the TTL bounds staleness across gunicorn worker processes.
+_user_cache = TTLCache(
+    maxsize=APP_CONFIG.get("USER_CACHE_SIZE", 2048),
+    ttl=APP_CONFIG.get("USER_CACHE_TTL", 30)
+)
+
+def load_user(user_id):
+    """Return the users row for ``user_id``, served from cache when fresh."""
+    if user_id is None:
+        return None
+    row = _user_cache.get(user_id)
+    if row is None:
+        cursor = db.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        if row is None:
+            return None
+        _user_cache.set(user_id, row)
+    # Hand out a copy so callers can't mutate the shared entry
+    return dict(row)
+
+def get_current_user():
+    """Return the logged-in user, loading it at most once per request."""
+    if not has_request_context() or 'user_id' not in session:
+        return None
+    user_id = session['user_id']
+    cached = g.get('_current_user')
+    if cached is not None and cached.get('id') == user_id:
+        return cached
+    user = load_user(user_id)
+    if user is not None:
+        g._current_user = user
+    return user
+
+def invalidate_user(user_id):
+    _user_cache.pop(user_id)
+    if has_request_context():
+        cached = g.get('_current_user')
+        if cached is not None and cached.get('id') == user_id:
+            g.pop('_current_user', None)
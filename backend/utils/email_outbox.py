@@ -0,0 +1,210 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from backend.config import EMAIL_OUTBOX_CONFIG, SMTP_CONFIG
+from backend.db import db
+from backend.utils.email_sender import SMTPSession
+from backend.utils.sql import in_clause
+
+# Outgoing mail is written to email_outbox (created by the baseline
+# migration) in the same transaction as the row that triggered it (e.g. the
+# OTP) and delivered by EmailWorker, so request threads never wait on SMTP.
+
+# Rows stuck in 'sending' this long belong to a worker that died mid-batch
+STALE_CLAIM_MINUTES = 10
+
+# Bodies carry OTPs, so a message that will never be sent keeps only its
+# address, subject and error for diagnosis
+REDACTED_BODY = "[redacted after final delivery failure]"
+
+def enqueue_email(cursor, to_email, subject, body):
+    """Queue a message; caller commits, then calls notify_email_worker()."""
+    cursor.execute(
+        "INSERT INTO email_outbox (to_email, subject, body) VALUES (%s, %s, %s)",
+        (to_email, subject, body)
+    )
+
+class EmailWorker:
+    """Background thread draining email_outbox over one reused SMTP session.
+
+    Batches are claimed with a single conditional UPDATE, so several worker
+    processes can share the table. Delivered rows are deleted (they carry
+    OTPs); failures are retried with exponential backoff and parked as
+    'failed', body redacted, after ``MAX_ATTEMPTS``. Failed rows are removed
+    by the purge_failed_emails maintenance job.
+    """
+
+    def __init__(self, smtp_config=None, config=None):
+        self.config = dict(EMAIL_OUTBOX_CONFIG, **(config or {}))
+        self.session = SMTPSession(smtp_config or SMTP_CONFIG, idle_timeout=self.config["SMTP_IDLE_TIMEOUT"])
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.metrics = {
+            "sent": 0,
+            "retried": 0,
+            "failed": 0,
+            "batches": 0,
+            "last_batch_at": None,
+            "last_error": None,
+        }
+
+    def start(self):
+        with self._lock:
+            # A thread started before a fork does not exist in the child
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self.worker_id = f"{socket.gethostname()}:{self._pid}"
+            self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.session.close()
+
+    def notify(self):
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            claimed = 0
+            try:
+                claimed = self.drain_once()
+            except Exception as e:
+                self.metrics["last_error"] = str(e)
+                print(f"Error draining email outbox: {e}")
+            finally:
+                db.release()
+            if claimed >= self.config["BATCH_SIZE"]:
+                continue
+            if self._wake.wait(self.config["POLL_INTERVAL"]):
+                self._wake.clear()
+            else:
+                self.session.close_if_idle()
+
+    def _claim(self, cursor):
+        cursor.execute(f"""
+            UPDATE email_outbox SET status='pending', claimed_by=NULL
+            WHERE status='sending' AND claimed_at < NOW() - INTERVAL {STALE_CLAIM_MINUTES} MINUTE
+        """)
+        token = f"{self.worker_id}:{uuid.uuid4().hex[:12]}"
+        cursor.execute("""
+            UPDATE email_outbox
+            SET status='sending', claimed_by=%s, claimed_at=NOW()
+            WHERE status='pending' AND next_attempt_at <= NOW()
+            ORDER BY id
+            LIMIT %s
+        """, (token, self.config["BATCH_SIZE"]))
+        db.commit()
+        if cursor.rowcount == 0:
+            return []
+        cursor.execute("""
+            SELECT id, to_email, subject, body, attempts
+            FROM email_outbox
+            WHERE claimed_by=%s AND status='sending'
+            ORDER BY id
+        """, (token,))
+        return cursor.fetchall()
+
+    def _backoff(self, attempts):
+        return min(self.config["BACKOFF_BASE"] * (2 ** max(attempts - 1, 0)), self.config["BACKOFF_MAX"])
+
+    def _deliver(self, row):
+        if not self.session.configured:
+            # Same development fallback as send_email()
+            print(f"\n[MOCK EMAIL]\nTo: {row['to_email']}\nSubject: {row['subject']}\nBody: {row['body']}\n")
+            return
+        self.session.send(row['to_email'], row['subject'], row['body'])
+
+    def drain_once(self):
+        """Claim and send one batch; returns the number of rows claimed."""
+        cursor = db.cursor(dictionary=True)
+        try:
+            rows = self._claim(cursor)
+            if not rows:
+                return 0
+            delivered = []
+            for row in rows:
+                try:
+                    self._deliver(row)
+                    delivered.append(row['id'])
+                except Exception as e:
+                    self.session.close()
+                    attempts = row['attempts'] + 1
+                    final = attempts >= self.config["MAX_ATTEMPTS"]
+                    cursor.execute("""
+                        UPDATE email_outbox
+                        SET status=%s, attempts=%s, last_error=%s, claimed_by=NULL,
+                            next_attempt_at=NOW() + INTERVAL %s SECOND,
+                            body=IF(%s, %s, body)
+                        WHERE id=%s
+                    """, ('failed' if final else 'pending', attempts, str(e)[:500], int(self._backoff(attempts)),
+                          final, REDACTED_BODY, row['id']))
+                    self.metrics["failed" if final else "retried"] += 1
+                    self.metrics["last_error"] = str(e)
+                    print(f"Error sending email to {row['to_email']} (attempt {attempts}): {e}")
+            if delivered:
+                placeholders, params = in_clause(delivered)
+                cursor.execute(f"DELETE FROM email_outbox WHERE id IN ({placeholders})", params)
+                self.metrics["sent"] += len(delivered)
+            db.commit()
+            self.metrics["batches"] += 1
+            self.metrics["last_batch_at"] = time.time()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def stats(self):
+        """Queue depth by status plus this process's delivery counters."""
+        out = dict(self.metrics)
+        out["smtp_connects"] = self.session.connects
+        out.update({"pending": 0, "sending": 0, "failed": 0})
+        cursor = db.cursor()
+        try:
+            cursor.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status")
+            for status, count in cursor.fetchall():
+                out[status] = count
+        finally:
+            cursor.close()
+        return out
+
+email_worker = EmailWorker()
+
+def start_email_worker(app=None):
+    if app is not None:
+        email_worker.session = SMTPSession(app.config, idle_timeout=email_worker.config["SMTP_IDLE_TIMEOUT"])
+    if email_worker.config["ENABLED"]:
+        email_worker.start()
+    return email_worker
+
+def notify_email_worker():
+    if email_worker.config["ENABLED"]:
+        email_worker.notify()
+
+def outbox_stats():
+    return email_worker.stats()
+
+if __name__ == "__main__":
+    # Standalone worker for deployments that run web processes with
+    # EMAIL_WORKER_ENABLED=false
+    email_worker.config["ENABLED"] = True
+    email_worker.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        email_worker.stop()
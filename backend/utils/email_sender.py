@@ -1,8 +1,12 @@
 import smtplib
 import ssl
 import os
+import time
 from flask import current_app
 
+def _build_message(sender, to_email, subject, body):
+    return f"From: {sender}\r\nTo: {to_email}\r\nSubject: {subject}\r\n\r\n{body}".encode("utf-8")
+
 def send_email(to_email, subject, body):
     host = current_app.config.get("SMTP_HOST")
     port = int(current_app.config.get("SMTP_PORT") or 587)
@@ -21,17 +25,17 @@ def send_email(to_email, subject, body):
         return True
 
     try:
-        message = f"From: {username}\r\nTo: {to_email}\r\nSubject: {subject}\r\n\r\n{body}"
+        message = _build_message(username, to_email, subject, body)
         if use_tls:
             context = ssl.create_default_context()
             with smtplib.SMTP(host, port, timeout=timeout) as server:
                 server.starttls(context=context)
                 server.login(username, password)
-                server.sendmail(username, [to_email], message.encode("utf-8"))
+                server.sendmail(username, [to_email], message)
         else:
             with smtplib.SMTP(host, port, timeout=timeout) as server:
                 server.login(username, password)
-                server.sendmail(username, [to_email], message.encode("utf-8"))
+                server.sendmail(username, [to_email], message)
         return True
     except Exception as e:
         current_app.logger.error("SMTP failed: %s", e)
@@ -54,3 +58,73 @@ def smtp_missing_keys():
     if not current_app.config.get("SMTP_PASSWORD"):
         missing.append("SMTP_PASSWORD")
     return missing
+
+class SMTPSession:
+    """One authenticated SMTP connection, kept open between sends.
+
+    Used by the outbox worker so a batch of mails costs a single
+    connect/STARTTLS/login. The connection is dropped after ``idle_timeout``
+    seconds without a send and re-established transparently if the server
+    has closed it.
+    """
+
+    def __init__(self, config, idle_timeout=60.0):
+        self.host = config.get("SMTP_HOST")
+        self.port = int(config.get("SMTP_PORT") or 587)
+        self.username = config.get("SMTP_USER")
+        self.password = config.get("SMTP_PASSWORD")
+        self.timeout = float(config.get("SMTP_TIMEOUT") or 7.0)
+        self.use_tls = str(config.get("SMTP_TLS", True)).lower() in ("1", "true", "yes", "on")
+        self.idle_timeout = float(idle_timeout)
+        self._server = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    @property
+    def configured(self):
+        return bool(self.host and self.username and self.password)
+
+    def _open(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls(context=ssl.create_default_context())
+            server.login(self.username, self.password)
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+            raise
+        self._server = server
+        self.connects += 1
+
+    def close_if_idle(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def send(self, to_email, subject, body):
+        self.close_if_idle()
+        if self._server is None:
+            self._open()
+        message = _build_message(self.username, to_email, subject, body)
+        try:
+            self._server.sendmail(self.username, [to_email], message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The server dropped an idle session; reconnect once and retry
+            self.close()
+            self._open()
+            self._server.sendmail(self.username, [to_email], message)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
@@ -0,0 +1,7 @@
+def normalize_email(email):
+    """Canonical stored form of an address: trimmed and lower-cased.
+
+    Every email column is written in this form (see migration 0002), so joins
+    and lookups are plain indexed equality rather than LOWER() comparisons.
+    """
+    return (email or "").strip().lower()
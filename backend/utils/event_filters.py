@@ -0,0 +1,140 @@
+import re
+from datetime import datetime, date
+
+_YEAR_MAP = {
+    "1": "1st", "i": "1st", "first": "1st", "1st": "1st",
+    "2": "2nd", "ii": "2nd", "second": "2nd", "2nd": "2nd",
+    "3": "3rd", "iii": "3rd", "third": "3rd", "3rd": "3rd",
+    "4": "4th", "iv": "4th", "fourth": "4th", "4th": "4th"
+}
+
+# InnoDB's default innodb_ft_min_token_size; shorter words are not indexed
+FT_MIN_WORD_LEN = 3
+FT_MAX_WORDS = 10
+_FT_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+EVENT_SEARCH_COLUMNS = ('title', 'organizer', 'description', 'domains')
+
+_DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M", "%d-%m-%Y", "%d/%m/%Y")
+
+def normalize_year(y):
+    y = (y or "").strip().lower().replace("year", "").strip()
+    return _YEAR_MAP.get(y, y)
+
+def normalize_target_years(value):
+    """'1st Year, II' -> '1st,2nd'; stored alongside target_years for FIND_IN_SET."""
+    if not value:
+        return None
+    years = []
+    for part in str(value).split(","):
+        y = normalize_year(part)
+        if y and y not in years:
+            years.append(y)
+    return ",".join(years) or None
+
+def parse_date(value):
+    """Parse form/legacy date input once at write time; returns a date or None."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def like_pattern(term):
+    """%term% with LIKE wildcards in the user's input escaped."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def boolean_query(text):
+    """'React native, UI' -> '+react* +native*' for MATCH ... IN BOOLEAN MODE.
+
+    Operators in the user's input are dropped and every remaining word must
+    match as a prefix. Returns None when no word is long enough to be in a
+    FULLTEXT index, in which case callers fall back to LIKE.
+    """
+    words = []
+    for w in _FT_WORD_RE.findall((text or "").lower()):
+        if len(w) >= FT_MIN_WORD_LEN and w not in words:
+            words.append(w)
+    if not words:
+        return None
+    return " ".join(f"+{w}*" for w in words[:FT_MAX_WORDS])
+
+def student_event_filters(columns, user_year=None, event_type=None, mode=None, domain=None,
+                          from_date=None, to_date=None, search=None, fulltext=False):
+    """Build the WHERE clause for events a student can still sign up for.
+
+    Returns (sql, params). Deadlines and end times compare against CURDATE()
+    directly so the date indexes on events can be used. With ``fulltext``
+    (a FULLTEXT index on EVENT_SEARCH_COLUMNS exists) the search term is
+    matched through that index instead of a LIKE scan.
+    """
+    where = []
+    params = []
+
+    has_reg_deadline = 'registration_deadline' in columns
+    has_deadline = 'deadline' in columns
+    if has_reg_deadline and has_deadline:
+        where.append("""(
+            (registration_deadline IS NOT NULL AND registration_deadline >= CURDATE())
+            OR (registration_deadline IS NULL AND (deadline IS NULL OR deadline >= CURDATE()))
+        )""")
+    elif has_reg_deadline:
+        where.append("(registration_deadline IS NULL OR registration_deadline >= CURDATE())")
+    elif has_deadline:
+        where.append("(deadline IS NULL OR deadline >= CURDATE())")
+
+    if 'end_time' in columns:
+        where.append("(end_time IS NULL OR end_time >= CURDATE())")
+
+    year = normalize_year(user_year)
+    if year and 'target_years' in columns:
+        # Hackathons are open to every year
+        if 'target_years_norm' in columns:
+            year_match = "FIND_IN_SET(%s, target_years_norm)"
+            params_year = [year]
+        else:
+            year_match = "target_years LIKE %s"
+            params_year = [f"%{year}%"]
+        type_clause = "event_type = 'hackathon' OR " if 'event_type' in columns else ""
+        where.append(f"({type_clause}target_years IS NULL OR target_years = '' OR {year_match})")
+        params.extend(params_year)
+
+    # The events table uses a case-insensitive collation, so plain equality
+    # matches the old lower()-based comparisons and stays indexable.
+    if event_type and 'event_type' in columns:
+        where.append("event_type = %s")
+        params.append(event_type.strip())
+    if mode and 'mode' in columns:
+        where.append("mode = %s")
+        params.append(mode.strip())
+    if domain and 'domains' in columns:
+        where.append("domains LIKE %s")
+        params.append(like_pattern(domain.strip()))
+
+    if from_date and 'event_date' in columns:
+        where.append("(event_date IS NULL OR event_date >= %s)")
+        params.append(from_date)
+    if to_date and 'event_date' in columns:
+        where.append("(event_date IS NULL OR event_date <= %s)")
+        params.append(to_date)
+
+    if search:
+        ft_query = boolean_query(search) if fulltext else None
+        fields = [c for c in EVENT_SEARCH_COLUMNS if c in columns]
+        if ft_query:
+            where.append(f"MATCH({', '.join(EVENT_SEARCH_COLUMNS)}) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(ft_query)
+        elif fields:
+            where.append(f"CONCAT_WS(' ', {', '.join(fields)}) LIKE %s")
+            params.append(like_pattern(search.strip()))
+
+    sql = ("WHERE " + " AND ".join(where)) if where else ""
+    return sql, params
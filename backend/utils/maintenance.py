@@ -0,0 +1,212 @@
+import os
+import sys
+import threading
+import time
+from backend.config import EMAIL_OUTBOX_CONFIG, MAINTENANCE_CONFIG
+from backend.db import db
+from backend.utils.capacity import reconcile_seats, seat_drift
+from backend.utils.schema import has_column
+from backend.utils.sql import in_clause
+
+# Housekeeping that used to happen inside user requests (e.g. team_chat
+# deleting a finished event's messages on the first GET) or not at all
+# (expired OTP codes, undeliverable mail, seat counters drifting from the
+# accepted requests). Jobs run from a background thread every
+# MAINTENANCE_INTERVAL seconds, or once from cron:
+#
+#     python -m backend.utils.maintenance [job ...]
+#
+# Each job takes a MySQL named lock, so with several worker processes only
+# one runs it at a time, and works in bounded batches with a commit after
+# each so no statement holds locks on a large range.
+IDS_PER_BATCH = 200
+
+def _delete_in_batches(sql, params, batch_size, pause):
+    """Run ``DELETE ... LIMIT %s`` until fewer than ``batch_size`` rows go."""
+    total = 0
+    cursor = db.cursor()
+    try:
+        while True:
+            cursor.execute(sql, (*params, batch_size))
+            deleted = cursor.rowcount
+            db.commit()
+            total += deleted
+            if deleted < batch_size:
+                return total
+            time.sleep(pause)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def purge_ended_chats(batch_size, pause=0.0):
+    """Delete team chat messages of teams whose event has ended."""
+    total = 0
+    last_id = 0
+    while True:
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                SELECT tr.id
+                FROM team_requests tr
+                JOIN events e ON tr.event_id = e.id
+                WHERE tr.id > %s
+                  AND CASE
+                        WHEN e.end_time IS NOT NULL THEN (e.end_time < NOW())
+                        WHEN e.deadline IS NOT NULL THEN (e.deadline < CURDATE())
+                        ELSE 0
+                      END
+                  AND EXISTS (SELECT 1 FROM team_chat_messages m WHERE m.team_request_id = tr.id)
+                ORDER BY tr.id
+                LIMIT %s
+            """, (last_id, IDS_PER_BATCH))
+            rooms = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        if not rooms:
+            return total
+        last_id = rooms[-1]
+        ph, params = in_clause(rooms)
+        total += _delete_in_batches(
+            f"DELETE FROM team_chat_messages WHERE team_request_id IN ({ph}) ORDER BY id LIMIT %s",
+            params, batch_size, pause
+        )
+        if len(rooms) < IDS_PER_BATCH:
+            return total
+
+def purge_otp_codes(batch_size, pause=0.0):
+    """Delete OTP codes that have expired or been used."""
+    return _delete_in_batches(
+        "DELETE FROM otp_codes WHERE expires_at < NOW() OR used = 1 LIMIT %s",
+        (), batch_size, pause
+    )
+
+def purge_failed_emails(batch_size, pause=0.0):
+    """Delete outbox rows parked as 'failed' longer than the retention period."""
+    return _delete_in_batches(
+        """
+        DELETE FROM email_outbox
+        WHERE status = 'failed' AND next_attempt_at < NOW() - INTERVAL %s DAY
+        LIMIT %s
+        """,
+        (EMAIL_OUTBOX_CONFIG["FAILED_RETENTION_DAYS"],), batch_size, pause
+    )
+
+def reconcile_collaboration_seats(batch_size, pause=0.0):
+    """Recount accepted_students / accepted_faculty where they have drifted
+    from the accepted collaboration requests (users deleted, roles changed,
+    rows edited by hand)."""
+    if not has_column('faculty_collaborations', 'accepted_students'):
+        return 0
+    fixed = 0
+    last_id = 0
+    while True:
+        cursor = db.cursor()
+        try:
+            drifted = seat_drift(cursor, last_id, IDS_PER_BATCH)
+            db.commit()
+            for collaboration_id in drifted:
+                reconcile_seats(cursor, collaboration_id)
+                db.commit()
+                fixed += 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+        if len(drifted) < IDS_PER_BATCH:
+            return fixed
+        last_id = drifted[-1]
+        time.sleep(pause)
+
+JOBS = {
+    "purge_ended_chats": purge_ended_chats,
+    "purge_otp_codes": purge_otp_codes,
+    "purge_failed_emails": purge_failed_emails,
+    "reconcile_collaboration_seats": reconcile_collaboration_seats,
+}
+
+def run_job(name, config=None):
+    """Run one job under its named lock; returns rows affected, or None if
+    another process holds the lock."""
+    config = dict(MAINTENANCE_CONFIG, **(config or {}))
+    lock = f"anveshan_maintenance_{name}"
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (lock,))
+        if cursor.fetchone()[0] != 1:
+            return None
+        try:
+            return JOBS[name](config["BATCH_SIZE"], config["BATCH_PAUSE"])
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (lock,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
+
+class MaintenanceWorker:
+    """Background thread running every job in JOBS each ``INTERVAL`` seconds."""
+
+    def __init__(self, config=None):
+        self.config = dict(MAINTENANCE_CONFIG, **(config or {}))
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.metrics = {"runs": 0, "last_run_at": None, "last_result": {}, "last_error": None}
+
+    def start(self):
+        with self._lock:
+            # A thread started before a fork does not exist in the child
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self):
+        result = {}
+        for name in JOBS:
+            try:
+                result[name] = run_job(name, self.config)
+            except Exception as e:
+                self.metrics["last_error"] = f"{name}: {e}"
+                print(f"Error running maintenance job {name}: {e}")
+            finally:
+                db.release()
+        self.metrics["runs"] += 1
+        self.metrics["last_run_at"] = time.time()
+        self.metrics["last_result"] = result
+        return result
+
+    def _run(self):
+        while not self._stop.wait(self.config["INTERVAL"]):
+            self.run_once()
+
+maintenance_worker = MaintenanceWorker()
+
+def start_maintenance_worker(app=None):
+    if maintenance_worker.config["ENABLED"]:
+        maintenance_worker.start()
+    return maintenance_worker
+
+if __name__ == "__main__":
+    # One-off run for cron; deployments doing this can set MAINTENANCE_ENABLED=false
+    names = sys.argv[1:] or list(JOBS)
+    unknown = [n for n in names if n not in JOBS]
+    if unknown:
+        print(f"Unknown job(s): {', '.join(unknown)}; available: {', '.join(JOBS)}")
+        sys.exit(2)
+    for name in names:
+        try:
+            result = run_job(name)
+            print(f"{name}: {'skipped (locked)' if result is None else result}")
+        finally:
+            db.release()
@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TokenBucket:
+    """Thread-safe per-key token buckets held in process memory.
+
+    Each key starts with ``capacity`` tokens and regains one every
+    ``interval`` seconds. At most ``maxsize`` keys are tracked; the least
+    recently used is dropped first (a dropped key starts over with a full
+    bucket). Limits are per worker process.
+    """
+
+    def __init__(self, capacity=5, interval=60.0, maxsize=10000):
+        self.capacity = max(1, int(capacity))
+        self.interval = max(0.001, float(interval))
+        self.maxsize = max(1, int(maxsize))
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _refill(self, key, now):
+        tokens, stamp = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - stamp) / self.interval)
+
+    def consume(self, key):
+        """Take one token for ``key``; False when the bucket is empty."""
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refill(key, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def retry_after(self, key):
+        """Seconds until ``key`` has a token again (0 if it has one now)."""
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._buckets:
+                return 0
+            tokens = self._refill(key, now)
+        return 0 if tokens >= 1 else int((1 - tokens) * self.interval) + 1
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
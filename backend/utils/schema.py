@@ -0,0 +1,88 @@
+import threading
+import time
+from backend.db import db
+from backend.config import APP_CONFIG
+
+class SchemaRegistry:
+    """Process-wide cache of table/column names (and FULLTEXT indexes) for the current database.
+
+    Loaded with a single information_schema query on first use and reloaded
+    after ``ttl`` seconds, or immediately via ``refresh()`` (e.g. after a
+    migration adds a column).
+    """
+
+    def __init__(self, ttl=300.0):
+        self.ttl = float(ttl)
+        self._snap = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        cursor = db.cursor()
+        try:
+            cursor.execute("""
+                SELECT TABLE_NAME, COLUMN_NAME
+                FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE()
+            """)
+            tables = {}
+            for table, column in cursor.fetchall():
+                tables.setdefault(str(table).lower(), set()).add(str(column).lower())
+            cursor.execute("""
+                SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'FULLTEXT'
+                ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+            """)
+            indexes = {}
+            for table, index, column in cursor.fetchall():
+                indexes.setdefault((str(table).lower(), index), []).append(str(column).lower())
+            fulltext = {}
+            for (table, _), cols in indexes.items():
+                fulltext.setdefault(table, set()).add(frozenset(cols))
+        finally:
+            cursor.close()
+        return tables, fulltext
+
+    def _snapshot(self):
+        snap = self._snap
+        if snap is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return snap
+        with self._lock:
+            if self._snap is None or time.monotonic() - self._loaded_at >= self.ttl:
+                self._snap = self._load()
+                self._loaded_at = time.monotonic()
+            return self._snap
+
+    def refresh(self):
+        with self._lock:
+            self._snap = None
+            self._loaded_at = 0.0
+
+    def has_table(self, table):
+        return table.lower() in self._snapshot()[0]
+
+    def has_column(self, table, column):
+        return column.lower() in self._snapshot()[0].get(table.lower(), ())
+
+    def columns(self, table):
+        return frozenset(self._snapshot()[0].get(table.lower(), ()))
+
+    def has_fulltext(self, table, columns):
+        """True if a FULLTEXT index covers exactly ``columns`` (as MATCH() requires)."""
+        wanted = frozenset(c.lower() for c in columns)
+        return wanted in self._snapshot()[1].get(table.lower(), ())
+
+schema = SchemaRegistry(ttl=APP_CONFIG.get("SCHEMA_CACHE_TTL", 300))
+
+def has_table(table):
+    return schema.has_table(table)
+
+def has_column(table, column):
+    return schema.has_column(table, column)
+
+def table_columns(table):
+    return schema.columns(table)
+
+def has_fulltext(table, columns):
+    return schema.has_fulltext(table, columns)
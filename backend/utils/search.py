@@ -0,0 +1,98 @@
+from backend.utils.event_filters import EVENT_SEARCH_COLUMNS, boolean_query, like_pattern
+from backend.utils.schema import has_fulltext, table_columns
+
+# Ranked keyword search over the browsable tables. Each source is matched
+# through a FULLTEXT index (created by the baseline migration) and ordered by
+# MATCH() relevance, so a page of results costs an index lookup rather than
+# a scan of every row. Where the index is missing the same query runs with
+# LIKE and newest-first ordering.
+SEARCH_PER_PAGE = 10
+SEARCH_MAX_PER_PAGE = 50
+
+SEARCH_SOURCES = {
+    'events': {
+        'table': 'events',
+        'index': 'ft_events_search',
+        'columns': EVENT_SEARCH_COLUMNS,
+        'select': "id, title, event_type, organizer, event_date, deadline, domains",
+        'where': "",
+    },
+    'projects': {
+        'table': 'personal_projects',
+        'index': 'ft_personal_projects_search',
+        'columns': ('title', 'domain', 'description', 'tech_stack', 'looking_for'),
+        'select': "id, user_id, title, domain, tech_stack, looking_for, created_at",
+        'where': "",
+    },
+    'collaborations': {
+        'table': 'faculty_collaborations',
+        'index': 'ft_faculty_collaborations_search',
+        'columns': ('title', 'description', 'required_skills'),
+        'select': "id, faculty_id, title, collaboration_type, audience, required_skills, created_at",
+        'where': "status = 'open'",
+    },
+    'profiles': {
+        'table': 'users',
+        'index': 'ft_users_search',
+        'columns': ('name', 'bio', 'skills', 'interests'),
+        'select': "id, name, role, profile_photo, skills, interests",
+        'where': "role IN ('student', 'faculty')",
+    },
+}
+
+FULLTEXT_INDEXES = [(s['table'], s['index'], s['columns']) for s in SEARCH_SOURCES.values()]
+
+def _visibility(kind, viewer_role):
+    if kind == 'collaborations' and viewer_role != 'faculty':
+        return "audience IN ('students_only', 'both')"
+    return ""
+
+def search(cursor, kind, text, page=1, per_page=SEARCH_PER_PAGE, viewer_role=None):
+    """One page of ``kind`` rows matching ``text``, best match first.
+
+    Returns {'results', 'total', 'page', 'total_pages'}; cursor must be a
+    dictionary cursor.
+    """
+    source = SEARCH_SOURCES[kind]
+    table = source['table']
+    per_page = max(1, min(int(per_page), SEARCH_MAX_PER_PAGE))
+    page = max(1, int(page))
+
+    where = [w for w in (source['where'], _visibility(kind, viewer_role)) if w]
+    params = []
+    ft_query = boolean_query(text) if has_fulltext(table, source['columns']) else None
+    if ft_query:
+        match = f"MATCH({', '.join(source['columns'])}) AGAINST (%s IN BOOLEAN MODE)"
+        where.append(match)
+        params.append(ft_query)
+        score_sql = f"{match} AS score"
+        score_params = [ft_query]
+        order_sql = "score DESC, id DESC"
+    else:
+        columns = table_columns(table)
+        fields = [c for c in source['columns'] if c in columns]
+        if not fields or not (text or "").strip():
+            return {'results': [], 'total': 0, 'page': 1, 'total_pages': 1}
+        where.append(f"CONCAT_WS(' ', {', '.join(fields)}) LIKE %s")
+        params.append(like_pattern(text.strip()))
+        score_sql = "0 AS score"
+        score_params = []
+        order_sql = "id DESC"
+
+    where_sql = "WHERE " + " AND ".join(where)
+    cursor.execute(f"SELECT COUNT(*) AS total FROM {table} {where_sql}", tuple(params))
+    total = cursor.fetchone()['total'] or 0
+    total_pages = max(1, -(-total // per_page))
+    page = min(page, total_pages)
+
+    cursor.execute(f"""
+        SELECT {source['select']}, {score_sql}
+        FROM {table}
+        {where_sql}
+        ORDER BY {order_sql}
+        LIMIT %s OFFSET %s
+    """, (*score_params, *params, per_page, (page - 1) * per_page))
+    results = cursor.fetchall()
+    for row in results:
+        row['score'] = round(float(row['score'] or 0), 4)
+    return {'results': results, 'total': total, 'page': page, 'total_pages': total_pages}
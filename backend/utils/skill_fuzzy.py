@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from backend.utils.skills import KNOWN_TERMS
+
+# Typo-tolerant lookup over every skill token in use. Trigrams narrow the
+# vocabulary to a few candidates; the final decision is an edit-distance
+# bound, which handles transpositions ('pyhton') that trigram overlap alone
+# scores poorly, without pairing 'web development' with 'app development'.
+MIN_FUZZY_LEN = 5          # shorter tokens ('java', 'ml', 'c++') only match exactly
+CANDIDATES_PER_TERM = 20
+RELOAD_SECONDS = 600       # pick up tokens indexed by other worker processes
+
+def max_edits(term):
+    if len(term) < MIN_FUZZY_LEN:
+        return 0
+    return 1 if len(term) < 9 else 2
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent transpositions count as
+    one edit); returns limit + 1 once the distance exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+class FuzzySkillIndex:
+    """Trigram index over the normalized skill vocabulary.
+
+    Loaded once from the token tables, then kept current by the
+    skill_index sync_* functions as profiles, team requests and
+    collaborations are saved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._grams = defaultdict(set)
+        self._terms = set()
+        self._similar = {}
+        self._loaded_at = None
+
+    def add(self, terms):
+        new = [t for t in terms if t and t not in self._terms]
+        if not new:
+            return
+        with self._lock:
+            for t in new:
+                if t in self._terms:
+                    continue
+                self._terms.add(t)
+                for g in trigrams(t):
+                    self._grams[g].add(t)
+            self._similar = {}
+
+    def ensure_loaded(self, cursor):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < RELOAD_SECONDS:
+            return
+        cursor.execute("""
+            SELECT skill FROM user_skills
+            UNION SELECT skill FROM team_request_skills
+            UNION SELECT skill FROM collaboration_skills
+        """)
+        rows = cursor.fetchall()
+        self.add(KNOWN_TERMS)
+        self.add(r['skill'] if isinstance(r, dict) else r[0] for r in rows)
+        self._loaded_at = time.monotonic()
+
+    def similar(self, term):
+        """[(vocabulary term, similarity 0..1)] within the edit bound, best first."""
+        term = (term or "").strip().lower()
+        cached = self._similar.get(term)
+        if cached is not None:
+            return cached
+        limit = max_edits(term)
+        out = []
+        if limit:
+            shared = Counter()
+            with self._lock:
+                for g in trigrams(term):
+                    shared.update(self._grams.get(g, ()))
+            for cand, _ in shared.most_common(CANDIDATES_PER_TERM):
+                if cand == term or max_edits(cand) == 0:
+                    continue
+                d = edit_distance(term, cand, limit)
+                if d <= limit:
+                    out.append((cand, round(1 - d / max(len(term), len(cand)), 3)))
+            out.sort(key=lambda pair: (-pair[1], pair[0]))
+        if len(self._similar) > 10000:
+            self._similar = {}
+        self._similar[term] = out
+        return out
+
+    def expand(self, tokens):
+        out = set(tokens)
+        for t in tokens:
+            out.update(c for c, _ in self.similar(t))
+        return out
+
+fuzzy_index = FuzzySkillIndex()
+
+def fuzzy_expand(cursor, tokens):
+    """``tokens`` plus close spellings already present in the token tables."""
+    try:
+        fuzzy_index.ensure_loaded(cursor)
+    except Exception as e:
+        print(f"Error loading fuzzy skill index: {e}")
+    return fuzzy_index.expand(tokens)
+
+def similar_skills(term):
+    return fuzzy_index.similar(term)
@@ -0,0 +1,85 @@
+import re
+from backend.utils.cache import TTLCache
+from backend.utils.skill_fuzzy import fuzzy_index
+from backend.utils.skills import expand_skills
+
+# Normalized skill tokens live in three side tables so matching is an indexed
+# equality join instead of one LIKE '%term%' scan per expanded term:
+#   user_skills(user_id, skill)
+#   team_request_skills(team_request_id, source, skill)   source: domain | skill
+#   collaboration_skills(collaboration_id, kind, skill)   kind: must | nice | general
+# The tables and their initial backfill live in the baseline migration.
+SKILL_MAX_LEN = 100
+
+SKILL_SPLIT_RE = re.compile(r'[/&]|\band\b')
+
+def skill_tokens(*values):
+    """Normalize comma-separated skill strings into a set of index tokens.
+
+    Each entry is lower-cased, split on '/', '&' and 'and', and expanded with
+    the known synonyms, so 'UI/UX' yields {'ui/ux', 'ui', 'ux', ...}.
+    """
+    terms = []
+    for value in values:
+        if not value:
+            continue
+        for part in str(value).split(','):
+            t = part.strip().lower()
+            if not t:
+                continue
+            terms.append(t)
+            terms.extend(p.strip() for p in SKILL_SPLIT_RE.split(t) if p.strip())
+    return {t[:SKILL_MAX_LEN] for t in expand_skills(terms) if t}
+
+# In-memory mirror of user tokens. Entries remember the raw strings they were
+# built from, so a row fetched after another worker's profile save is re-tokenized.
+_user_tokens = TTLCache(maxsize=20000, ttl=600)
+
+def user_tokens(user):
+    """Token set for a users row (needs 'id', 'skills' and 'interests')."""
+    raw = (user.get('skills') or '', user.get('interests') or '')
+    uid = user.get('id')
+    entry = _user_tokens.get(uid) if uid is not None else None
+    if entry is not None and entry[0] == raw:
+        return entry[1]
+    tokens = frozenset(skill_tokens(*raw))
+    if uid is not None:
+        _user_tokens.set(uid, (raw, tokens))
+    return tokens
+
+def sync_user_skills(cursor, user_id, skills, interests):
+    """Rewrite the user's tokens; caller commits."""
+    tokens = skill_tokens(skills, interests)
+    fuzzy_index.add(tokens)
+    cursor.execute("DELETE FROM user_skills WHERE user_id = %s", (user_id,))
+    if tokens:
+        cursor.executemany(
+            "INSERT INTO user_skills (user_id, skill) VALUES (%s, %s)",
+            [(user_id, t) for t in sorted(tokens)]
+        )
+    _user_tokens.set(user_id, ((skills or '', interests or ''), frozenset(tokens)))
+
+def sync_team_request_skills(cursor, team_request_id, domain, required_skills):
+    """Rewrite a team request's tokens; caller commits."""
+    cursor.execute("DELETE FROM team_request_skills WHERE team_request_id = %s", (team_request_id,))
+    rows = [(team_request_id, 'domain', t) for t in sorted(skill_tokens(domain))]
+    rows += [(team_request_id, 'skill', t) for t in sorted(skill_tokens(required_skills))]
+    fuzzy_index.add(t for _, _, t in rows)
+    if rows:
+        cursor.executemany(
+            "INSERT INTO team_request_skills (team_request_id, source, skill) VALUES (%s, %s, %s)",
+            rows
+        )
+
+def sync_collaboration_skills(cursor, collaboration_id, must, nice, general):
+    """Rewrite a faculty collaboration's tokens; caller commits."""
+    cursor.execute("DELETE FROM collaboration_skills WHERE collaboration_id = %s", (collaboration_id,))
+    rows = []
+    for kind, value in (('must', must), ('nice', nice), ('general', general)):
+        rows.extend((collaboration_id, kind, t) for t in sorted(skill_tokens(value)))
+    fuzzy_index.add(t for _, _, t in rows)
+    if rows:
+        cursor.executemany(
+            "INSERT INTO collaboration_skills (collaboration_id, kind, skill) VALUES (%s, %s, %s)",
+            rows
+        )
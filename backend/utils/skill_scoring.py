@@ -0,0 +1,141 @@
+import threading
+from backend.utils.cache import TTLCache
+from backend.utils.skill_fuzzy import similar_skills
+from backend.utils.skill_index import SKILL_SPLIT_RE, user_tokens
+from backend.utils.skills import expand_skills
+from backend.utils.sql import in_clause
+
+# Candidates fetched from the skill index before scoring; ranking happens in
+# memory, so this can be far larger than the handful shown on the page.
+CANDIDATE_POOL = 200
+CANDIDATE_FIELDS = ("id", "name", "role", "skills", "interests", "profile_photo")
+
+MUST_WEIGHT = 2
+NICE_WEIGHT = 1
+GENERAL_WEIGHT = 1
+
+class SkillVocabulary:
+    """Append-only token -> bit position map shared by all encoded vectors.
+
+    Positions never change once assigned, so cached masks stay valid as the
+    vocabulary grows.
+    """
+
+    def __init__(self):
+        self._bits = {}
+        self._lock = threading.Lock()
+
+    def bit(self, token):
+        b = self._bits.get(token)
+        if b is None:
+            with self._lock:
+                b = self._bits.setdefault(token, len(self._bits))
+        return b
+
+    def encode(self, tokens):
+        mask = 0
+        for t in tokens:
+            mask |= 1 << self.bit(t)
+        return mask
+
+    def __len__(self):
+        return len(self._bits)
+
+vocabulary = SkillVocabulary()
+
+_user_masks = TTLCache(maxsize=20000, ttl=600)
+
+def user_mask(user):
+    """Bit vector of a users row's skill tokens (see skill_index.user_tokens)."""
+    tokens = user_tokens(user)
+    uid = user.get('id')
+    entry = _user_masks.get(uid) if uid is not None else None
+    if entry is not None and entry[0] is tokens:
+        return entry[1]
+    mask = vocabulary.encode(tokens)
+    if uid is not None:
+        _user_masks.set(uid, (tokens, mask))
+    return mask
+
+def split_terms(*values):
+    """Comma-separated requirement strings -> lower-cased terms, with
+    'UI/UX' or 'ML & AI' broken into their parts."""
+    out = []
+    for value in values:
+        if not value:
+            continue
+        for part in str(value).split(','):
+            t = part.strip().lower()
+            if not t:
+                continue
+            parts = [p.strip() for p in SKILL_SPLIT_RE.split(t) if p.strip()]
+            out.extend(parts if parts else [t])
+    return out
+
+class RequirementProfile:
+    """Weighted requirement terms, each pre-encoded as a synonym bitmask.
+
+    A term is satisfied when any of its synonyms (or a close spelling from
+    the fuzzy index) is among the candidate's tokens, i.e. when its mask
+    intersects the candidate's mask.
+    """
+
+    def __init__(self, must=(), nice=(), general=()):
+        self.terms = []
+        for weight, terms in ((MUST_WEIGHT, must), (NICE_WEIGHT, nice), (GENERAL_WEIGHT, general)):
+            for t in terms:
+                # Close misspellings already in the token tables count as the term
+                tokens = set(expand_skills([t]))
+                tokens.update(c for c, _ in similar_skills(t))
+                self.terms.append((weight, vocabulary.encode(tokens)))
+        self.total = sum(w for w, _ in self.terms)
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    def score(self, mask):
+        return sum(w for w, term_mask in self.terms if term_mask & mask)
+
+    def percent(self, score):
+        return int(round(100 * score / self.total)) if self.total > 0 else 0
+
+def candidate_pool(cursor, role, exclude_id, tokens, size=CANDIDATE_POOL):
+    """Up to ``size`` users with ``role`` (other than ``exclude_id``) for
+    rank_candidates, preselected by how many of ``tokens`` they share so the
+    best matches are always in the pool. Without tokens, the first ``size`` by id.
+    """
+    fields = ", ".join(f"u.{c}" for c in CANDIDATE_FIELDS)
+    if not tokens:
+        cursor.execute(
+            f"SELECT {fields} FROM users u WHERE u.role = %s AND u.id != %s ORDER BY u.id LIMIT %s",
+            (role, exclude_id, size)
+        )
+        return cursor.fetchall()
+    ph, tokens = in_clause(sorted(tokens))
+    cursor.execute(f"""
+        SELECT {fields}
+        FROM (
+            SELECT us.user_id, COUNT(*) AS hits
+            FROM user_skills us
+            JOIN users m ON m.id = us.user_id
+            WHERE us.skill IN ({ph}) AND m.role = %s AND m.id != %s
+            GROUP BY us.user_id
+            ORDER BY hits DESC, us.user_id
+            LIMIT %s
+        ) overlap
+        JOIN users u ON u.id = overlap.user_id
+        ORDER BY overlap.hits DESC, u.id
+    """, (*tokens, role, exclude_id, size))
+    return cursor.fetchall()
+
+def rank_candidates(profile, candidates, limit=None):
+    """Score users against ``profile``, set ``match_percent`` on each and
+    return them best first (stable for ties), trimmed to ``limit``."""
+    scored = []
+    for u in candidates:
+        s = profile.score(user_mask(u))
+        u['match_percent'] = profile.percent(s)
+        scored.append((s, u))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    ranked = [u for _, u in scored]
+    return ranked[:limit] if limit is not None else ranked
@@ -1,3 +1,5 @@
+import re
+
 
 SKILL_SYNONYMS = {
     'ai': ['artificial intelligence'],
@@ -27,10 +29,75 @@ SKILL_SYNONYMS = {
     'python': ['py']
 }
 
+# Compiled once at import: SKILL_SYNONYMS is treated as an undirected graph
+# and each connected component becomes one synonym group, so chains such as
+# ui <-> ui/ux <-> user interface resolve completely whichever term is used.
+def _build_groups(synonyms):
+    parent = {}
+
+    def find(t):
+        parent.setdefault(t, t)
+        while parent[t] != t:
+            parent[t] = parent[parent[t]]
+            t = parent[t]
+        return t
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+
+    order = []
+    for k, vs in synonyms.items():
+        k = k.strip().lower()
+        if k not in parent:
+            order.append(k)
+        find(k)
+        for v in vs:
+            v = v.strip().lower()
+            if v not in parent:
+                order.append(v)
+            union(k, v)
+
+    groups, group_of = [], {}
+    root_ids = {}
+    for t in order:
+        gid = root_ids.setdefault(find(t), len(root_ids))
+        if gid == len(groups):
+            groups.append([])
+        groups[gid].append(t)
+        group_of[t] = gid
+    return [frozenset(g) for g in groups], [g[0] for g in groups], group_of
+
+SKILL_GROUPS, CANONICAL_TERMS, _GROUP_OF = _build_groups(SKILL_SYNONYMS)
+KNOWN_TERMS = frozenset(_GROUP_OF)
+
+# One alternation over every known term, longest first so 'ui/ux' wins over
+# 'ui'; the lookarounds stop 'ai' from matching inside 'maintain'.
+_TERM_RE = re.compile(
+    r"(?<![a-z0-9])(" + "|".join(re.escape(t) for t in sorted(KNOWN_TERMS, key=len, reverse=True)) + r")(?![a-z0-9])"
+)
+
+def canonical_id(term):
+    """Synonym group id for a known term, else None."""
+    return _GROUP_OF.get((term or "").strip().lower())
+
+def canonical(term):
+    """Representative spelling of a term's synonym group (the term itself if unknown)."""
+    t = (term or "").strip().lower()
+    gid = _GROUP_OF.get(t)
+    return CANONICAL_TERMS[gid] if gid is not None else t
+
+def synonyms(term):
+    """Every spelling in the term's group, including the term itself."""
+    t = (term or "").strip().lower()
+    gid = _GROUP_OF.get(t)
+    return SKILL_GROUPS[gid] if gid is not None else frozenset((t,)) if t else frozenset()
+
 def expand_skills(skills_list):
     """
     Takes a list of skills and returns a list containing the original skills
-    plus any known synonyms/expansions.
+    plus every synonym in their groups.
     """
     expanded = set()
     for skill in skills_list:
@@ -38,17 +105,19 @@ def expand_skills(skills_list):
             continue
         s_lower = skill.strip().lower()
         expanded.add(s_lower)
-        
-        # Add synonyms if they exist
-        if s_lower in SKILL_SYNONYMS:
-            expanded.update(SKILL_SYNONYMS[s_lower])
-            
+        gid = _GROUP_OF.get(s_lower)
+        if gid is not None:
+            expanded.update(SKILL_GROUPS[gid])
     return list(expanded)
 
+def find_known_terms(text):
+    """Canonical terms mentioned in free text, in order of first mention, in one regex pass."""
+    seen = []
+    for m in _TERM_RE.finditer((text or "").lower()):
+        c = CANONICAL_TERMS[_GROUP_OF[m.group(1)]]
+        if c not in seen:
+            seen.append(c)
+    return seen
+
 def all_known_terms():
-    base = set()
-    for k, vs in SKILL_SYNONYMS.items():
-        base.add(k.strip().lower())
-        for v in vs:
-            base.add(v.strip().lower())
-    return base
+    return KNOWN_TERMS
@@ -0,0 +1,30 @@
+import base64
+import json
+
+def in_clause(values):
+    """Return ('%s, %s, ...', params) for an SQL IN list."""
+    values = list(values)
+    return ", ".join(["%s"] * len(values)), values
+
+def batched(values, size=500):
+    """Yield successive chunks of ``values`` to keep IN lists bounded."""
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def encode_cursor(values):
+    """Opaque keyset-pagination token for the sort key of the last row sent."""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token, size):
+    """Inverse of encode_cursor; None for a missing or malformed token."""
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
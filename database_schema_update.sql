@@ -1,3 +1,5 @@
+-- Historical one-off script; the schema is now maintained in backend/migrations
+-- (python -m backend.migrations).
 -- Add event_type column if it doesn't exist
 ALTER TABLE events
 ADD COLUMN IF NOT EXISTS event_type VARCHAR(50) NOT NULL DEFAULT 'event' AFTER id;